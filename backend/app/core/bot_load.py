@@ -0,0 +1,132 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from redis.asyncio import Redis
+
+from backend.app.core.config import settings
+from backend.app.core.telegram import shared_redis
+
+USER_BOT_LOAD_KEY = "bot:load:user"
+
+
+class LoadReporter(BaseMiddleware):
+    # Update middleware that publishes how busy the bot is, so broadcasts that
+    # make users tap the bot can slow down while it catches up. Register it inside
+    # admission control: it then times only handled updates, and the admission
+    # queue is reported on its own through `queue_depth`.
+    def __init__(
+        self,
+        *,
+        queue_depth: Callable[[], int] = lambda: 0,
+        key: str = USER_BOT_LOAD_KEY,
+        interval: float = 1.0,
+        smoothing: float = 0.2,
+        redis: Redis | None = None,
+    ) -> None:
+        self.queue_depth = queue_depth
+        self.key = key
+        self.interval = interval
+        self.smoothing = smoothing
+        self.redis = redis
+        self.latency_ms = 0.0
+        self._started: dict[int, float] = {}
+        self._next_id = 0
+        self._handled = 0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def inflight(self) -> int:
+        return len(self._started)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        self._next_id += 1
+        update_id = self._next_id
+        self._started[update_id] = time.monotonic()
+        try:
+            return await handler(event, data)
+        finally:
+            started = self._started.pop(update_id)
+            self._handled += 1
+            elapsed_ms = (time.monotonic() - started) * 1000
+            self.latency_ms += self.smoothing * (elapsed_ms - self.latency_ms)
+
+    def current_latency_ms(self) -> float:
+        # Handlers stuck right now count too; the average only moves on completion.
+        if not self._started:
+            return self.latency_ms
+        oldest = (time.monotonic() - min(self._started.values())) * 1000
+        return max(self.latency_ms, oldest)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._publish_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _publish_loop(self) -> None:
+        # Published on a timer rather than per update, so a stalled bot keeps
+        # reporting itself busy; the key only expires if the process is gone.
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            rate = self._handled / max(now - last, 1e-6)
+            last = now
+            self._handled = 0
+            try:
+                await self.publish(rate)
+            except Exception:
+                # Pacing is best effort; never take the bot down over it.
+                pass
+
+    async def publish(self, updates_per_sec: float = 0.0) -> None:
+        redis = self.redis or shared_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(
+                self.key,
+                mapping={
+                    "inflight": self.inflight,
+                    "queue_depth": self.queue_depth(),
+                    "latency_ms": round(self.current_latency_ms()),
+                    "updates_per_sec": round(updates_per_sec, 1),
+                },
+            )
+            pipe.pexpire(self.key, int(self.interval * 5000))
+            await pipe.execute()
+
+
+class LoadPacer:
+    # Answers "is the user bot overloaded" for a paced broadcast, reading Redis at
+    # most once per interval however often the sender asks.
+    def __init__(self, redis: Redis, key: str = USER_BOT_LOAD_KEY, interval: float = 1.0) -> None:
+        self.redis = redis
+        self.key = key
+        self.interval = interval
+        self._checked = 0.0
+        self._overloaded = False
+
+    async def overloaded(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked < self.interval:
+            return self._overloaded
+        self._checked = now
+        load = await self.redis.hgetall(self.key)
+        # Running handlers plus updates waiting for an admission slot.
+        backlog = int(load.get(b"inflight", 0)) + int(load.get(b"queue_depth", 0))
+        latency_ms = float(load.get(b"latency_ms", 0))
+        self._overloaded = (
+            backlog >= settings.announce_pace_max_inflight
+            or latency_ms >= settings.announce_pace_max_latency_ms
+        )
+        return self._overloaded
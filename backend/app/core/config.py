@@ -19,6 +19,16 @@ class Settings(BaseSettings):
 
     # Redis
     redis_url: str = "redis://redis:6379/0"
+    # Bot FSM state lifetime in seconds, per StatesGroup name (JSON in the env)
+    fsm_default_ttl_seconds: int = 3600
+    fsm_state_ttls: dict[str, int] = {
+        "EntryStates": 86400,
+        "RejectStates": 3600,
+        "GiveawayCreateStates": 3600,
+        "GiveawayEditStates": 3600,
+        "BroadcastStates": 3600,
+        "DrawStates": 900,
+    }
 
     # Security / web admin
     session_secret: str = "change-me"
@@ -30,13 +40,65 @@ class Settings(BaseSettings):
     admin_tg_ids: str = ""
     public_channel: str = ""
 
+    # Telegram API limits, shared by every process through Redis
+    telegram_global_rate: int = 30
+    telegram_private_chat_rate: float = 1.0
+    telegram_group_chat_per_min: int = 20
+    # Tokens of the global bucket kept free for higher lanes: transactional sends
+    # leave this many for interactive replies, bulk broadcasts leave this many for both
+    telegram_transactional_reserve: int = 2
+    telegram_bulk_reserve: int = 6
+
     # Rate limits
     login_rate_limit: str = "5/minute"
     login_ban_max_attempts: int = 10
     login_ban_minutes: int = 30
 
     # Broadcast
+    # Starting rate; the sender adapts it between 1 and broadcast_max_rate_per_sec.
     broadcast_rate_per_sec: int = 25
+    broadcast_max_rate_per_sec: int = 30
+    broadcast_concurrency: int = 10
+    broadcast_shards: int = 1
+    broadcast_page_size: int = 1000
+    broadcast_flush_size: int = 200
+    broadcast_flush_seconds: float = 5.0
+    # Transient send errors (5xx, timeouts, RetryAfter) are retried with backoff
+    broadcast_max_retries: int = 5
+    broadcast_retry_base_seconds: float = 2.0
+    broadcast_retry_max_seconds: float = 300.0
+    # Chat for the preflight send and media re-upload; 0 means the creating admin
+    broadcast_preflight_chat_id: int = 0
+    # Abort when more than this share of the first N sends fails permanently
+    broadcast_breaker_window: int = 50
+    broadcast_breaker_threshold: float = 0.5
+    # Broadcasts skip a user after this many failed deliveries in a row
+    undeliverable_after_failures: int = 3
+    # Announcements slow down while the user bot is this busy (set by the bot in Redis):
+    # updates running plus waiting for admission, and handler latency
+    announce_pace_max_inflight: int = 50
+    announce_pace_max_latency_ms: int = 1500
+    announce_pace_min_rate: int = 2
+
+    # User bot admission control: handlers running at once (keep within the DB pool),
+    # updates allowed to queue, and how long one may wait before "try again"
+    user_bot_max_concurrency: int = 10
+    user_bot_max_waiting: int = 200
+    user_bot_max_wait_seconds: float = 5.0
+
+    # Tasks running at once on a worker process's shared event loop
+    worker_async_concurrency: int = 20
+    # Seconds before Redis redelivers an unacknowledged (acks_late) task
+    celery_visibility_timeout: int = 43200
+    # Safety sweep for the ETA-scheduled monthly rollover
+    automation_sweep_minutes: int = 60
+    # Leader lease around rollover/draw/announce, renewed every third of the TTL
+    automation_lease_seconds: int = 60
+
+    # Channel membership checks for the subscribed_verified segment
+    subscription_verify_ttl_hours: int = 24
+    subscription_check_concurrency: int = 10
+    subscription_check_rate: int = 20
 
 
 settings = Settings()
@@ -0,0 +1,236 @@
+import asyncio
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.enums import ParseMode
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import GetUpdates, Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from redis.asyncio import Redis
+
+from backend.app.core.config import settings
+
+# KEYS[1] bucket hash; ARGV: rate, capacity, pause seconds (0 to acquire), reserve.
+# A token is only taken while more than `reserve` tokens would remain.
+# Returns 0 when a token was taken, otherwise milliseconds to wait.
+_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local pause = tonumber(ARGV[3])
+local reserve = tonumber(ARGV[4]) or 0
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'paused_until')
+local tokens = tonumber(state[1]) or 1
+local ts = tonumber(state[2]) or now
+local paused_until = tonumber(state[3]) or 0
+local ttl = math.ceil(capacity / rate * 1000) + 60000
+if pause > 0 then
+  paused_until = math.max(paused_until, now + math.floor(pause * 1000))
+  redis.call('HSET', KEYS[1], 'tokens', 0, 'ts', now, 'paused_until', paused_until)
+  redis.call('PEXPIRE', KEYS[1], ttl + math.ceil(pause * 1000))
+  return 0
+end
+if now < paused_until then
+  return paused_until - now
+end
+tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate / 1000)
+local wait = 0
+if tokens >= 1 + reserve then
+  tokens = tokens - 1
+else
+  wait = math.ceil((1 + reserve - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], ttl)
+return wait
+"""
+
+
+class Lane(str, Enum):
+    interactive = "interactive"
+    transactional = "transactional"
+    bulk = "bulk"
+
+
+# Which lane the current task's requests belong to; bot replies are interactive.
+_lane: ContextVar[Lane] = ContextVar("telegram_lane", default=Lane.interactive)
+
+
+def set_lane(lane: Lane) -> None:
+    _lane.set(lane)
+
+
+@contextmanager
+def send_lane(lane: Lane):
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def _lane_reserve(lane: Lane) -> float:
+    # Tokens a lane has to leave in the shared bucket for the lanes above it, so
+    # bulk sends only spend what interactive and transactional traffic leaves over.
+    if lane == Lane.bulk:
+        return settings.telegram_bulk_reserve
+    if lane == Lane.transactional:
+        return settings.telegram_transactional_reserve
+    return 0
+
+
+# Telegram applies the per-chat limit to outgoing messages only.
+_CHAT_LIMITED_PREFIXES = ("Send", "Copy", "Forward")
+
+# (bot id, channel reference) -> numeric chat id; channel ids never change.
+_chat_ids: dict[tuple[int, str | int], int] = {}
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Redis]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class RedisTokenBucket:
+    # Token bucket whose budget is shared by every process that uses the same key.
+    def __init__(self, redis: Redis, key: str, rate: float, capacity: float | None = None) -> None:
+        self.rate = max(rate, 0.01)
+        self.capacity = capacity if capacity is not None else max(self.rate, 1.0)
+        self.key = key
+        self._script = redis.register_script(_BUCKET_SCRIPT)
+        self._pauses: set[asyncio.Task] = set()
+
+    def pause(self, seconds: float) -> None:
+        task = asyncio.create_task(self._call(seconds))
+        self._pauses.add(task)
+        task.add_done_callback(self._pauses.discard)
+
+    async def acquire(self, reserve: float = 0) -> None:
+        while True:
+            wait_ms = await self._call(0, reserve)
+            if wait_ms <= 0:
+                return
+            await asyncio.sleep(wait_ms / 1000)
+
+    async def _call(self, pause: float, reserve: float = 0) -> int:
+        return int(
+            await self._script(
+                keys=[self.key], args=[self.rate, self.capacity, pause, reserve]
+            )
+        )
+
+
+def shared_redis() -> Redis:
+    # redis.asyncio connections are bound to the loop that opened them; keep one
+    # client per loop so scripts running their own asyncio.run stay safe too.
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = Redis.from_url(settings.redis_url)
+        _clients[loop] = client
+    return client
+
+
+def bot_key(token: str) -> str:
+    # The numeric bot id before ":" is public; the secret part never reaches Redis.
+    return token.split(":", 1)[0] or "unknown"
+
+
+class RateGovernor(BaseRequestMiddleware):
+    def __init__(self, token: str) -> None:
+        self.bot_key = bot_key(token)
+
+    def _bucket(self, redis: Redis) -> RedisTokenBucket:
+        rate = settings.telegram_global_rate
+        capacity = max(rate, settings.telegram_bulk_reserve + 1)
+        return RedisTokenBucket(redis, f"tg:rate:{self.bot_key}", rate, capacity)
+
+    def _chat_bucket(self, redis: Redis, chat_id: int | str) -> RedisTokenBucket:
+        is_private = isinstance(chat_id, int) and chat_id > 0
+        rate = (
+            settings.telegram_private_chat_rate
+            if is_private
+            else settings.telegram_group_chat_per_min / 60
+        )
+        return RedisTokenBucket(redis, f"tg:rate:{self.bot_key}:chat:{chat_id}", rate, 3)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if isinstance(method, GetUpdates):
+            return await make_request(bot, method)
+        redis = shared_redis()
+        bucket = self._bucket(redis)
+        lane = _lane.get()
+        started = time.monotonic()
+        await bucket.acquire(_lane_reserve(lane))
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is not None and type(method).__name__.startswith(_CHAT_LIMITED_PREFIXES):
+            await self._chat_bucket(redis, chat_id).acquire()
+        stats_key = f"tg:stats:{self.bot_key}"
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hincrby(stats_key, "requests", 1)
+            pipe.hincrby(stats_key, f"requests:{lane.value}", 1)
+            pipe.hincrbyfloat(stats_key, "throttled_seconds", time.monotonic() - started)
+            await pipe.execute()
+        try:
+            return await make_request(bot, method)
+        except TelegramRetryAfter as exc:
+            # One RetryAfter pauses the token for every process, not just this one.
+            bucket.pause(exc.retry_after)
+            await redis.hincrby(stats_key, "retry_after", 1)
+            raise
+
+
+def create_bot(token: str) -> Bot:
+    bot = Bot(token=token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    bot.session.middleware(RateGovernor(token))
+    return bot
+
+
+def is_subscribed(member) -> bool:
+    if not member:
+        return False
+    if member.status in {"left", "kicked"}:
+        return False
+    if member.status == "restricted":
+        return bool(getattr(member, "is_member", False))
+    return True
+
+
+async def resolve_chat_id(bot: Bot, chat_ref: str | int) -> int:
+    if isinstance(chat_ref, int):
+        return chat_ref
+    key = (bot.id, chat_ref)
+    if key not in _chat_ids:
+        _chat_ids[key] = (await bot.get_chat(chat_ref)).id
+    return _chat_ids[key]
+
+
+async def governor_stats(redis: Redis, token: str) -> dict:
+    key = bot_key(token)
+    stats = await redis.hgetall(f"tg:stats:{key}")
+    tokens = await redis.hget(f"tg:rate:{key}", "tokens")
+    return {
+        "bot_id": key,
+        "rate_limit": settings.telegram_global_rate,
+        "requests": int(stats.get(b"requests", 0)),
+        "requests_by_lane": {
+            lane.value: int(stats.get(f"requests:{lane.value}".encode(), 0)) for lane in Lane
+        },
+        "throttled_seconds": round(float(stats.get(b"throttled_seconds", 0)), 3),
+        "retry_after": int(stats.get(b"retry_after", 0)),
+        "tokens_available": round(float(tokens), 2) if tokens is not None else None,
+    }
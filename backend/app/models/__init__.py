@@ -2,10 +2,14 @@ from backend.app.models.admin_audit_log import AdminAuditLog
 from backend.app.models.admin_login_attempt import AdminLoginAttempt
 from backend.app.models.admin_user import AdminUser
 from backend.app.models.broadcast import Broadcast
+from backend.app.models.broadcast_delivery import BroadcastDelivery
+from backend.app.models.broadcast_recipient import BroadcastRecipient
+from backend.app.models.channel_member import ChannelMember
 from backend.app.models.entry import Entry
 from backend.app.models.enums import (
     BroadcastPayloadType,
     BroadcastSegment,
+    DeliveryStatus,
     EntryStatus,
     GiveawayStatus,
 )
@@ -19,10 +23,14 @@ __all__ = [
     "AdminLoginAttempt",
     "AdminUser",
     "Broadcast",
+    "BroadcastDelivery",
+    "BroadcastRecipient",
+    "ChannelMember",
     "Entry",
     "EntryStatus",
     "BroadcastPayloadType",
     "BroadcastSegment",
+    "DeliveryStatus",
     "Giveaway",
     "GiveawayAutomationSettings",
     "GiveawayStatus",
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, Boolean, DateTime, Enum, Integer, Text
+from sqlalchemy import BigInteger, Boolean, DateTime, Enum, Float, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.app.db.base import Base
@@ -19,11 +19,20 @@ class Broadcast(Base):
         Enum(BroadcastPayloadType, name="broadcast_payload_type"), nullable=False
     )
     payload_file_id: Mapped[str | None] = mapped_column(Text)
+    # The same media re-uploaded through the user bot, which sends the broadcast.
+    staged_file_id: Mapped[str | None] = mapped_column(Text)
     text: Mapped[str | None] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     sent_ok: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     sent_fail: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Part of sent_fail: transient errors that were retried until giving up.
+    sent_gave_up: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    recipients_total: Mapped[int | None] = mapped_column(Integer)
+    send_rate: Mapped[float | None] = mapped_column(Float)
+    progress_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     is_cancelled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     cancelled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # Why the broadcast was aborted (failed preflight or tripped circuit breaker).
+    error: Mapped[str | None] = mapped_column(Text)
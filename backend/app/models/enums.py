@@ -24,3 +24,10 @@ class BroadcastPayloadType(str, Enum):
     video = "video"
     document = "document"
     video_note = "video_note"
+
+
+class DeliveryStatus(str, Enum):
+    sent = "sent"
+    failed = "failed"
+    blocked = "blocked"
+    gave_up = "gave_up"
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, Boolean, DateTime, String
+from sqlalchemy import BigInteger, Boolean, DateTime, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.app.db.base import Base
@@ -17,3 +17,16 @@ class User(Base):
     last_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     is_blocked: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     subscribed_verified_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # Consecutive broadcasts this user could not receive, reset by any delivery or
+    # message to the bot; broadcasts skip the user once it reaches the limit.
+    delivery_fail_streak: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_delivery_error: Mapped[str | None] = mapped_column(String(64))
+
+
+# Broadcast recipient order, see worker.recipients.
+Index(
+    "ix_users_activity",
+    User.last_seen_at.desc(),
+    User.delivery_fail_streak,
+    User.tg_id,
+)
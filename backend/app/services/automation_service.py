@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.core.time import utcnow
@@ -71,3 +71,33 @@ async def mark_run_month(
     settings.last_run_at = now
     settings.updated_at = utcnow()
     await session.flush()
+
+
+async def issue_automation_fence(session: AsyncSession) -> int:
+    # The counter lives next to the row it guards, so tokens keep growing even
+    # when Redis comes back empty. Commit before the rollover starts.
+    await get_automation_settings(session)
+    result = await session.execute(
+        update(GiveawayAutomationSettings)
+        .where(GiveawayAutomationSettings.id == 1)
+        .values(fence_token=func.coalesce(GiveawayAutomationSettings.fence_token, 0) + 1)
+        .returning(GiveawayAutomationSettings.fence_token)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one()
+
+
+async def claim_automation_fence(session: AsyncSession, *, token: int) -> bool:
+    # Row-locks the settings until commit, so rollovers run one after another, and
+    # refuses a holder once a newer one has been issued a token.
+    result = await session.execute(
+        update(GiveawayAutomationSettings)
+        .where(
+            GiveawayAutomationSettings.id == 1,
+            GiveawayAutomationSettings.fence_token == token,
+        )
+        .values(fence_token=token)
+        .returning(GiveawayAutomationSettings.id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none() is not None
@@ -1,3 +1,4 @@
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.core.time import utcnow
@@ -39,3 +40,37 @@ async def mark_broadcast_sent(
     broadcast.sent_ok = sent_ok
     broadcast.sent_fail = sent_fail
     return broadcast
+
+
+async def cancel_broadcast(session: AsyncSession, *, broadcast_id: int) -> Broadcast | None:
+    broadcast = await session.get(Broadcast, broadcast_id)
+    if not broadcast or broadcast.sent_at is not None or broadcast.is_cancelled:
+        return None
+    now = utcnow()
+    broadcast.is_cancelled = True
+    broadcast.cancelled_at = now
+    broadcast.sent_at = now
+    return broadcast
+
+
+async def record_progress(
+    session: AsyncSession,
+    *,
+    broadcast_id: int,
+    sent_ok: int,
+    sent_fail: int,
+    send_rate: float,
+) -> None:
+    # Increments rather than absolute values, so parallel shards can share the row;
+    # negative when a resumed recipient moves from failed to sent.
+    await session.execute(
+        update(Broadcast)
+        .where(Broadcast.id == broadcast_id)
+        .values(
+            sent_ok=Broadcast.sent_ok + sent_ok,
+            sent_fail=Broadcast.sent_fail + sent_fail,
+            send_rate=send_rate,
+            progress_at=utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
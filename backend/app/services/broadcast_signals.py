@@ -0,0 +1,57 @@
+import asyncio
+from contextlib import suppress
+
+from redis.asyncio import Redis
+
+from backend.app.core.config import settings
+
+CANCEL_CHANNEL = "broadcast:cancel"
+# The flag outlives the pub/sub message, so a worker that subscribes late still sees it.
+CANCEL_FLAG_TTL = 7 * 24 * 3600
+
+
+def _cancel_key(broadcast_id: int) -> str:
+    return f"broadcast:{broadcast_id}:cancelled"
+
+
+async def publish_cancel(broadcast_id: int) -> None:
+    client = Redis.from_url(settings.redis_url)
+    try:
+        await client.set(_cancel_key(broadcast_id), 1, ex=CANCEL_FLAG_TTL)
+        await client.publish(CANCEL_CHANNEL, broadcast_id)
+    finally:
+        await client.aclose()
+
+
+class CancelWatcher:
+    def __init__(self, redis: Redis, broadcast_id: int) -> None:
+        self.redis = redis
+        self.broadcast_id = broadcast_id
+        self.cancelled = False
+        self._pubsub = redis.pubsub()
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "CancelWatcher":
+        # Subscribe before reading the flag so a cancel between the two is not lost.
+        await self._pubsub.subscribe(CANCEL_CHANNEL)
+        if await self.redis.exists(_cancel_key(self.broadcast_id)):
+            self.cancelled = True
+        else:
+            self._task = asyncio.create_task(self._listen())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        await self._pubsub.unsubscribe(CANCEL_CHANNEL)
+        await self._pubsub.aclose()
+
+    async def _listen(self) -> None:
+        while not self.cancelled:
+            message = await self._pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=5.0
+            )
+            if message and int(message["data"]) == self.broadcast_id:
+                self.cancelled = True
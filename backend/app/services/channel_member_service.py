@@ -0,0 +1,53 @@
+from collections.abc import Sequence
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.time import utcnow
+from backend.app.models.channel_member import ChannelMember
+
+
+async def record_channel_members(
+    session: AsyncSession,
+    *,
+    chat_id: int,
+    members: Sequence[tuple[int, str, bool]],
+) -> None:
+    if not members:
+        return
+    now = utcnow()
+    stmt = insert(ChannelMember).values(
+        [
+            {
+                "chat_id": chat_id,
+                "tg_id": tg_id,
+                "status": status,
+                "is_member": is_member,
+                "updated_at": now,
+            }
+            for tg_id, status, is_member in members
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ChannelMember.chat_id, ChannelMember.tg_id],
+        set_={
+            "status": stmt.excluded.status,
+            "is_member": stmt.excluded.is_member,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    await session.execute(stmt)
+
+
+async def get_channel_membership(
+    session: AsyncSession, *, chat_id: int, tg_id: int
+) -> bool | None:
+    # None means the user is unknown and has to be checked through the API.
+    return (
+        await session.execute(
+            select(ChannelMember.is_member).where(
+                ChannelMember.chat_id == chat_id, ChannelMember.tg_id == tg_id
+            )
+        )
+    ).scalar_one_or_none()
@@ -0,0 +1,96 @@
+from sqlalchemy import BigInteger, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.time import utcnow
+from backend.app.models.broadcast_delivery import BroadcastDelivery
+from backend.app.models.enums import DeliveryStatus
+
+# Recipients in these states are skipped when a broadcast is resumed.
+FINAL_STATUSES = (DeliveryStatus.sent, DeliveryStatus.blocked)
+
+
+def progress_delta(
+    results: list[tuple[int, DeliveryStatus, str | None]],
+    previous: dict[int, DeliveryStatus],
+) -> tuple[int, int]:
+    # How sent_ok / sent_fail change when `results` replace the `previous` statuses
+    # of the same recipients: a resumed broadcast moves a recipient between the
+    # counters instead of counting it again.
+    sent_ok = sent_fail = 0
+    for tg_id, status, _ in results:
+        old = previous.get(tg_id)
+        if old == status:
+            continue
+        if old is not None:
+            if old == DeliveryStatus.sent:
+                sent_ok -= 1
+            else:
+                sent_fail -= 1
+        if status == DeliveryStatus.sent:
+            sent_ok += 1
+        else:
+            sent_fail += 1
+    return sent_ok, sent_fail
+
+
+async def record_deliveries(
+    session: AsyncSession,
+    *,
+    broadcast_id: int,
+    results: list[tuple[int, DeliveryStatus, str | None]],
+) -> tuple[int, int]:
+    # Returns the (sent_ok, sent_fail) progress change, see progress_delta.
+    if not results:
+        return 0, 0
+    tg_ids = [tg_id for tg_id, _, _ in results]
+    previous = dict(
+        (
+            await session.execute(
+                select(BroadcastDelivery.tg_id, BroadcastDelivery.status).where(
+                    BroadcastDelivery.broadcast_id == broadcast_id,
+                    BroadcastDelivery.tg_id
+                    == any_(bindparam("tg_ids", tg_ids, type_=ARRAY(BigInteger))),
+                )
+            )
+        ).all()
+    )
+    now = utcnow()
+    stmt = insert(BroadcastDelivery).values(
+        [
+            {
+                "broadcast_id": broadcast_id,
+                "tg_id": tg_id,
+                "status": status,
+                "error": error,
+                "created_at": now,
+            }
+            for tg_id, status, error in results
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[BroadcastDelivery.broadcast_id, BroadcastDelivery.tg_id],
+        set_={
+            "status": stmt.excluded.status,
+            "error": stmt.excluded.error,
+            "created_at": stmt.excluded.created_at,
+        },
+    )
+    await session.execute(stmt)
+    return progress_delta(results, previous)
+
+
+async def count_deliveries(
+    session: AsyncSession, *, broadcast_id: int
+) -> dict[DeliveryStatus, int]:
+    rows = (
+        await session.execute(
+            select(BroadcastDelivery.status, func.count())
+            .where(BroadcastDelivery.broadcast_id == broadcast_id)
+            .group_by(BroadcastDelivery.status)
+        )
+    ).all()
+    counts = dict.fromkeys(DeliveryStatus, 0)
+    for status, count in rows:
+        counts[status] = count
+    return counts
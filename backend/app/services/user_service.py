@@ -1,10 +1,17 @@
-from sqlalchemy import select
+from collections.abc import Sequence
+
+from sqlalchemy import BigInteger, any_, bindparam, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.core.time import utcnow
 from backend.app.models.user import User
 
 
+def _tg_id_in(tg_ids: Sequence[int]):
+    return User.tg_id == any_(bindparam("tg_ids", list(tg_ids), type_=ARRAY(BigInteger)))
+
+
 async def upsert_user(session: AsyncSession, *, tg_id: int, username: str | None) -> User:
     result = await session.execute(select(User).where(User.tg_id == tg_id))
     user = result.scalar_one_or_none()
@@ -12,6 +19,10 @@ async def upsert_user(session: AsyncSession, *, tg_id: int, username: str | None
     if user:
         user.username = username
         user.last_seen_at = now
+        # Writing to the bot proves the chat is reachable again.
+        user.is_blocked = False
+        user.delivery_fail_streak = 0
+        user.last_delivery_error = None
         return user
 
     user = User(
@@ -20,6 +31,7 @@ async def upsert_user(session: AsyncSession, *, tg_id: int, username: str | None
         first_seen_at=now,
         last_seen_at=now,
         is_blocked=False,
+        delivery_fail_streak=0,
     )
     session.add(user)
     return user
@@ -31,7 +43,59 @@ async def mark_blocked(session: AsyncSession, *, tg_id: int) -> None:
         user.is_blocked = True
 
 
+async def mark_blocked_many(session: AsyncSession, *, tg_ids: Sequence[int]) -> None:
+    if not tg_ids:
+        return
+    await session.execute(
+        update(User)
+        .where(_tg_id_in(tg_ids))
+        .values(is_blocked=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def record_delivery_outcomes(
+    session: AsyncSession,
+    *,
+    delivered: Sequence[int],
+    failures: Sequence[tuple[int, str | None]],
+) -> None:
+    if delivered:
+        await session.execute(
+            update(User)
+            .where(_tg_id_in(delivered), User.delivery_fail_streak > 0)
+            .values(delivery_fail_streak=0, last_delivery_error=None)
+            .execution_options(synchronize_session=False)
+        )
+    by_error: dict[str | None, list[int]] = {}
+    for tg_id, error in failures:
+        by_error.setdefault(error, []).append(tg_id)
+    for error, tg_ids in by_error.items():
+        await session.execute(
+            update(User)
+            .where(_tg_id_in(tg_ids))
+            .values(
+                delivery_fail_streak=User.delivery_fail_streak + 1,
+                last_delivery_error=error,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+
 async def mark_subscribed_verified(session: AsyncSession, *, tg_id: int) -> None:
     user = await session.get(User, tg_id)
     if user:
         user.subscribed_verified_at = utcnow()
+
+
+async def mark_subscribed_verified_many(
+    session: AsyncSession, *, tg_ids: Sequence[int]
+) -> None:
+    if not tg_ids:
+        return
+    await session.execute(
+        update(User)
+        .where(_tg_id_in(tg_ids))
+        .values(subscribed_verified_at=utcnow())
+        .execution_options(synchronize_session=False)
+    )
@@ -1,22 +1,18 @@
 import random
 from datetime import datetime, timedelta, timezone
 
-from aiogram import Bot
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums import ParseMode
 from fastapi import APIRouter, Depends, Form, Request, Response
 from fastapi import HTTPException
-from aiogram import Bot
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums import ParseMode
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from jinja2 import Environment, FileSystemLoader, select_autoescape
+from redis.asyncio import Redis
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from sqlalchemy import String, cast, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.core.config import settings
+from backend.app.core.telegram import create_bot, governor_stats
 from backend.app.core.time import utcnow
 from backend.app.db.session import get_session
 from backend.app.models.broadcast import Broadcast
@@ -37,7 +33,8 @@ from backend.app.services.automation_service import (
     get_automation_settings,
     update_automation_settings,
 )
-from backend.app.services.broadcast_service import create_broadcast
+from backend.app.services.broadcast_service import cancel_broadcast, create_broadcast
+from backend.app.services.broadcast_signals import publish_cancel
 from backend.app.services.errors import ActiveGiveawayExists
 from backend.app.services.giveaway_service import (
     close_giveaway,
@@ -112,6 +109,22 @@ def compute_next_run_at_with_start(
     return compute_next_run_at(day_of_month, now)
 
 
+def broadcast_progress(broadcast: Broadcast) -> dict:
+    done = broadcast.sent_ok + broadcast.sent_fail
+    total = broadcast.recipients_total
+    if not total:
+        return {"percent": None, "eta": None}
+    percent = min(round(done * 100 / total, 1), 100.0)
+    eta = None
+    if broadcast.started_at and broadcast.progress_at and done:
+        # Average throughput since start, so parallel shards are counted together.
+        elapsed = (broadcast.progress_at - broadcast.started_at).total_seconds()
+        if elapsed > 0:
+            remaining = max(total - done, 0) / (done / elapsed)
+            eta = (broadcast.progress_at + timedelta(seconds=remaining)).isoformat()
+    return {"percent": percent, "eta": eta}
+
+
 def render(template_name: str, **context):
     template = env.get_template(template_name)
     return HTMLResponse(template.render(**context))
@@ -230,10 +243,7 @@ async def dashboard(
     channel_members = None
     if settings.public_channel:
         try:
-            async with Bot(
-                token=settings.admin_bot_token,
-                default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-            ) as bot:
+            async with create_bot(settings.admin_bot_token) as bot:
                 channel_members = await bot.get_chat_member_count(
                     settings.public_channel
                 )
@@ -278,6 +288,8 @@ async def dashboard(
     ).scalar_one_or_none()
     latest_ok = latest_broadcast.sent_ok if latest_broadcast else 0
     latest_fail = latest_broadcast.sent_fail if latest_broadcast else 0
+    latest_gave_up = latest_broadcast.sent_gave_up if latest_broadcast else 0
+    latest_error = latest_broadcast.error if latest_broadcast else None
     latest_broadcast_at = (
         latest_broadcast.created_at.astimezone(MSK_TZ)
         if latest_broadcast and latest_broadcast.created_at
@@ -295,6 +307,8 @@ async def dashboard(
         rejected=rejected,
         sent_ok=latest_ok,
         sent_fail=latest_fail,
+        sent_gave_up=latest_gave_up,
+        broadcast_error=latest_error,
         latest_broadcast_at=latest_broadcast_at,
         format_date_only=format_date_only,
         csrf=get_csrf_token(request),
@@ -333,8 +347,12 @@ async def broadcasts_active(
             "payload_type": payload_labels.get(b.payload_type, b.payload_type.value),
             "sent_ok": b.sent_ok,
             "sent_fail": b.sent_fail,
+            "gave_up": b.sent_gave_up,
+            "total": b.recipients_total,
+            "rate": round(b.send_rate, 1) if b.send_rate else None,
             "created_at": b.created_at.isoformat(),
             "started_at": b.started_at.isoformat() if b.started_at else None,
+            **broadcast_progress(b),
         }
         for b in rows
     ]
@@ -351,11 +369,8 @@ async def broadcasts_stop(
     csrf_token = request.headers.get("x-csrf-token") or ""
     if csrf_token:
         verify_csrf(request, csrf_token)
-    broadcast = await session.get(Broadcast, broadcast_id)
-    if broadcast and broadcast.sent_at is None and not broadcast.is_cancelled:
-        broadcast.is_cancelled = True
-        broadcast.cancelled_at = utcnow()
-        broadcast.sent_at = utcnow()
+    broadcast = await cancel_broadcast(session, broadcast_id=broadcast_id)
+    if broadcast:
         await log_action(
             session,
             actor_tg_id=0,
@@ -363,9 +378,26 @@ async def broadcasts_stop(
             payload={"broadcast_id": broadcast_id},
         )
         await session.commit()
+        await publish_cancel(broadcast_id)
     return JSONResponse({"ok": True})
 
 
+@router.get("/telegram/stats")
+async def telegram_stats(
+    request: Request,
+    user: str = Depends(login_required),
+):
+    redis = Redis.from_url(settings.redis_url)
+    try:
+        items = {
+            "user_bot": await governor_stats(redis, settings.user_bot_token),
+            "admin_bot": await governor_stats(redis, settings.admin_bot_token),
+        }
+    finally:
+        await redis.aclose()
+    return JSONResponse(items)
+
+
 @router.get("/admins")
 async def admins_list(
     request: Request,
@@ -863,6 +895,7 @@ async def giveaway_automation_update(
         },
     )
     await session.commit()
+    celery_app.send_task("worker.tasks.schedule_automation")
     return RedirectResponse(url="/admin/giveaway?auto_saved=1", status_code=302)
 
 
@@ -882,6 +915,7 @@ async def giveaway_automation_disable(
         payload={},
     )
     await session.commit()
+    celery_app.send_task("worker.tasks.schedule_automation")
     return RedirectResponse(url="/admin/giveaway", status_code=302)
 
 
@@ -978,10 +1012,7 @@ async def winners_draw(
     )
     await session.commit()
 
-    async with Bot(
-        token=settings.admin_bot_token,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-    ) as public_bot:
+    async with create_bot(settings.admin_bot_token) as public_bot:
         for entry in winners:
             user_data = users[entry.id]
             username = user_data.username
@@ -2,13 +2,10 @@ import asyncio
 import random
 from datetime import datetime
 
-from aiogram import Bot, Dispatcher, F, Router
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums import ParseMode
-from aiogram.filters import Command
+from aiogram import Dispatcher, F, Router
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder, ReplyKeyboardBuilder
 from sqlalchemy import func, select
@@ -16,10 +13,12 @@ import re
 
 from backend.app.core.config import settings
 from backend.app.core.logging import setup_logging
+from backend.app.core.telegram import create_bot
 from backend.app.db.session import SessionLocal
 from backend.app.models.admin_user import AdminUser
 from backend.app.core.time import utcnow
 from backend.app.db.session import SessionLocal
+from backend.app.models.broadcast import Broadcast
 from backend.app.models.entry import Entry
 from backend.app.models.enums import (
     BroadcastPayloadType,
@@ -31,7 +30,8 @@ from backend.app.models.giveaway import Giveaway
 from backend.app.models.user import User
 from backend.app.services.audit_service import log_action
 from backend.app.services.automation_service import disable_automation
-from backend.app.services.broadcast_service import create_broadcast
+from backend.app.services.broadcast_service import cancel_broadcast, create_broadcast
+from backend.app.services.broadcast_signals import publish_cancel
 from backend.app.services.errors import ActiveGiveawayExists
 from backend.app.services.giveaway_service import (
     close_giveaway,
@@ -40,6 +40,7 @@ from backend.app.services.giveaway_service import (
     update_giveaway,
 )
 from backend.app.services.winner_service import create_winner
+from bots.common.storage import create_storage
 from worker.celery_app import celery_app
 
 router = Router()
@@ -775,7 +776,12 @@ async def broadcast_confirm(callback, state: FSMContext):
         await session.commit()
         await session.refresh(broadcast)
 
-    celery_app.send_task("worker.tasks.send_broadcast", args=[broadcast.id])
+    task_name = (
+        "worker.tasks.send_broadcast_sharded"
+        if settings.broadcast_shards > 1
+        else "worker.tasks.send_broadcast"
+    )
+    celery_app.send_task(task_name, args=[broadcast.id])
     preview_chat_id = data.get("preview_chat_id")
     preview_message_id = data.get("preview_message_id")
     if preview_chat_id and preview_message_id:
@@ -785,7 +791,11 @@ async def broadcast_confirm(callback, state: FSMContext):
             )
         except Exception:
             pass
-    await callback.message.answer("Рассылка поставлена в очередь", reply_markup=admin_menu())
+    await callback.message.answer(
+        f"Рассылка #{broadcast.id} поставлена в очередь\n"
+        f"Остановить: /broadcast_stop {broadcast.id}",
+        reply_markup=admin_menu(),
+    )
     await state.clear()
     await callback.answer()
 
@@ -807,6 +817,39 @@ async def broadcast_cancel(callback, state: FSMContext):
     await callback.answer()
 
 
+@router.message(Command("broadcast_stop"))
+async def broadcast_stop(message: Message, command: CommandObject):
+    if not await ensure_admin(message):
+        return
+    async with SessionLocal() as session:
+        if command.args and command.args.strip().isdigit():
+            broadcast_id = int(command.args.strip())
+        else:
+            broadcast_id = (
+                await session.execute(
+                    select(Broadcast.id)
+                    .where(Broadcast.sent_at.is_(None), Broadcast.is_cancelled.is_(False))
+                    .order_by(Broadcast.created_at.desc())
+                    .limit(1)
+                )
+            ).scalar_one_or_none()
+        broadcast = None
+        if broadcast_id:
+            broadcast = await cancel_broadcast(session, broadcast_id=broadcast_id)
+        if not broadcast:
+            await message.answer("Нет активной рассылки", reply_markup=admin_menu())
+            return
+        await log_action(
+            session,
+            actor_tg_id=message.from_user.id,
+            action="broadcast_cancel_bot",
+            payload={"broadcast_id": broadcast.id},
+        )
+        await session.commit()
+    await publish_cancel(broadcast.id)
+    await message.answer(f"Рассылка #{broadcast.id} остановлена", reply_markup=admin_menu())
+
+
 @router.message(Command("draw"))
 async def draw_start(message: Message, state: FSMContext):
     if not await ensure_admin(message):
@@ -912,10 +955,7 @@ async def draw_confirm(callback, state: FSMContext):
         )
         await session.commit()
 
-    async with Bot(
-        token=settings.admin_bot_token,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-    ) as public_bot:
+    async with create_bot(settings.admin_bot_token) as public_bot:
         winner_tg_ids = []
         for entry in winners:
             user = users[entry.id]
@@ -961,11 +1001,8 @@ async def draw_cancel(callback, state: FSMContext):
 
 def run() -> None:
     setup_logging()
-    bot = Bot(
-        token=settings.admin_bot_token,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-    )
-    dp = Dispatcher(storage=MemoryStorage())
+    bot = create_bot(settings.admin_bot_token)
+    dp = Dispatcher(storage=create_storage())
     dp.include_router(router)
     asyncio.run(dp.start_polling(bot))
 
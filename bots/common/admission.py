@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update, User
+
+from bots.common import messages
+
+logger = logging.getLogger(__name__)
+
+
+def _tap_key(user: User | None, update: Update) -> tuple[int, str] | None:
+    # The same button or command from the same user; photos and other input are
+    # never treated as duplicates.
+    if user is None:
+        return None
+    if update.callback_query and update.callback_query.data:
+        return user.id, f"cb:{update.callback_query.data}"
+    if update.message and update.message.text:
+        return user.id, f"msg:{update.message.text}"
+    return None
+
+
+class AdmissionControl(BaseMiddleware):
+    # Outer update middleware: at most `concurrency` handlers run at once (each
+    # holds a DB connection and may call the Bot API), a repeated tap is dropped
+    # while the first one is still being handled, and user input that cannot get a
+    # slot within `max_wait` seconds is answered with a "try again" instead.
+    def __init__(self, *, concurrency: int, max_waiting: int, max_wait: float) -> None:
+        self._slots = asyncio.Semaphore(max(concurrency, 1))
+        self.max_waiting = max_waiting
+        self.max_wait = max_wait
+        self.waiting = 0
+        self.coalesced = 0
+        self.shed = 0
+        self._inflight: set[tuple[int, str]] = set()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Update):
+            return await handler(event, data)
+        key = _tap_key(data.get("event_from_user"), event)
+        if key is not None and key in self._inflight:
+            self.coalesced += 1
+            await _reply(event, None)
+            return None
+        if key is not None:
+            self._inflight.add(key)
+        try:
+            # Only user input can be shed; service updates (chat_member, ...) wait.
+            sheddable = event.message is not None or event.callback_query is not None
+            if not await self._admit(sheddable):
+                self.shed += 1
+                await _reply(event, messages.TRY_AGAIN_LATER)
+                return None
+            try:
+                return await handler(event, data)
+            finally:
+                self._slots.release()
+        finally:
+            if key is not None:
+                self._inflight.discard(key)
+
+    async def _admit(self, sheddable: bool) -> bool:
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return True
+        if sheddable and self.waiting >= self.max_waiting:
+            return False
+        self.waiting += 1
+        try:
+            if sheddable:
+                await asyncio.wait_for(self._slots.acquire(), self.max_wait)
+            else:
+                await self._slots.acquire()
+        except TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+        return True
+
+
+async def _reply(update: Update, text: str | None) -> None:
+    # A callback always gets answered so the button stops spinning.
+    try:
+        if update.callback_query:
+            await update.callback_query.answer(text)
+        elif update.message and text:
+            await update.message.answer(text)
+    except Exception:
+        logger.warning("Failed to answer a shed update", exc_info=True)
@@ -43,3 +43,4 @@ DRAW_AT = "Розыгрыш состоится: {dt}"
 RULES_TEXT = "Правила розыгрыша:\n{rules}"
 MODERATION_APPROVED = "Ваша заявка одобрена!"
 MODERATION_REJECTED = "Ваша заявка отклонена. Причина: {reason}"
+TRY_AGAIN_LATER = "Сейчас очень много запросов. Попробуйте ещё раз через минуту."
@@ -0,0 +1,104 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import DefaultKeyBuilder, StateType, StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+from redis.asyncio import Redis
+
+from backend.app.core.config import settings
+from backend.app.models import enums
+
+# Handlers keep datetimes and model enums in FSM data, as they could with
+# MemoryStorage; tag them so they come back as the same types from Redis.
+_ENUMS = {
+    name: cls
+    for name, cls in vars(enums).items()
+    if isinstance(cls, type) and issubclass(cls, Enum) and cls is not Enum
+}
+
+
+def _pack(value: Any) -> Any:
+    # str enums would otherwise be written as plain strings by json itself.
+    if isinstance(value, Enum) and type(value).__name__ in _ENUMS:
+        return {"__enum__": type(value).__name__, "value": value.value}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, dict):
+        return {key: _pack(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_pack(item) for item in value]
+    return value
+
+
+def _unpack(obj: dict[str, Any]) -> Any:
+    if "__enum__" in obj:
+        return _ENUMS[obj["__enum__"]](obj["value"])
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    if "__date__" in obj:
+        return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+def dumps_fsm_data(data: dict[str, Any]) -> str:
+    return json.dumps(_pack(data))
+
+
+def loads_fsm_data(raw: str) -> dict[str, Any]:
+    return json.loads(raw, object_hook=_unpack)
+
+
+class GroupTTLStorage(RedisStorage):
+    # FSM state in Redis, shared by every replica and kept across restarts. Each
+    # StatesGroup gets its own lifetime, so an abandoned flow disappears on its own;
+    # state and data of a conversation always expire together.
+    def __init__(
+        self, redis: Redis, *, ttls: dict[str, int], default_ttl: int, **kwargs: Any
+    ) -> None:
+        # Both bots share one Redis and may talk to the same admin.
+        kwargs.setdefault("key_builder", DefaultKeyBuilder(with_bot_id=True))
+        kwargs.setdefault("json_dumps", dumps_fsm_data)
+        kwargs.setdefault("json_loads", loads_fsm_data)
+        super().__init__(redis, **kwargs)
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+
+    def ttl_for(self, state: str | None) -> int:
+        if state is None:
+            return self.default_ttl
+        group = state.split(":", 1)[0]
+        return self.ttls.get(group, self.default_ttl)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state_key = self.key_builder.build(key, "state")
+        data_key = self.key_builder.build(key, "data")
+        if state is None:
+            await self.redis.delete(state_key)
+            return
+        value = state.state if isinstance(state, State) else state
+        ttl = self.ttl_for(value)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(state_key, value, ex=ttl)
+            pipe.expire(data_key, ttl)
+            await pipe.execute()
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]) -> None:
+        data_key = self.key_builder.build(key, "data")
+        if not data:
+            await self.redis.delete(data_key)
+            return
+        ttl = self.ttl_for(await self.get_state(key))
+        await self.redis.set(data_key, self.json_dumps(data), ex=ttl)
+
+
+def create_storage() -> GroupTTLStorage:
+    return GroupTTLStorage.from_url(
+        settings.redis_url,
+        ttls=settings.fsm_state_ttls,
+        default_ttl=settings.fsm_default_ttl_seconds,
+    )
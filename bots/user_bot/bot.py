@@ -2,15 +2,13 @@ import asyncio
 import re
 from datetime import datetime, timedelta, timezone
 
-from aiogram import Bot, Dispatcher, F, Router
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums import ParseMode
+from aiogram import Dispatcher, F, Router
 from aiogram.filters import CommandStart
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import (
     CallbackQuery,
+    ChatMemberUpdated,
     KeyboardButton,
     Message,
     ReplyKeyboardMarkup,
@@ -19,18 +17,26 @@ from aiogram.types import (
 from aiogram.utils.keyboard import InlineKeyboardBuilder, ReplyKeyboardBuilder
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.app.core.bot_load import LoadReporter
 from backend.app.core.config import settings
 from backend.app.core.logging import setup_logging
+from backend.app.core.telegram import create_bot, is_subscribed, resolve_chat_id
 from backend.app.core.time import utcnow
 from backend.app.db.session import SessionLocal
 from backend.app.models.enums import EntryStatus, GiveawayStatus
 from backend.app.models.entry import Entry
 from backend.app.models.giveaway import Giveaway
 from backend.app.services.audit_service import log_action
+from backend.app.services.channel_member_service import (
+    get_channel_membership,
+    record_channel_members,
+)
 from backend.app.services.entry_service import create_entry, get_entry_for_user
 from backend.app.services.giveaway_service import get_active_giveaway
 from backend.app.services.user_service import mark_subscribed_verified, upsert_user
 from bots.common import messages
+from bots.common.admission import AdmissionControl
+from bots.common.storage import create_storage
 
 router = Router()
 # User bot should only react to direct/private messages, not group chat messages.
@@ -79,14 +85,27 @@ def normalize_channel(value: str) -> str | int:
     return f"@{raw}"
 
 
-def is_subscribed(member) -> bool:
-    if not member:
+async def channel_subscribed(
+    session: AsyncSession, bot, channel: str, tg_id: int, *, recheck: bool = False
+) -> bool:
+    # channel_members follows chat_member updates, so the API is only asked about
+    # users it has not seen yet, or about users seen leaving when they ask to re-check.
+    try:
+        chat_id = await resolve_chat_id(bot, normalize_channel(channel))
+    except Exception:
         return False
-    if member.status in {"left", "kicked"}:
+    known = await get_channel_membership(session, chat_id=chat_id, tg_id=tg_id)
+    if known or (known is False and not recheck):
+        return bool(known)
+    try:
+        member = await bot.get_chat_member(chat_id, tg_id)
+    except Exception:
         return False
-    if member.status == "restricted":
-        return bool(getattr(member, "is_member", False))
-    return True
+    subscribed = is_subscribed(member)
+    await record_channel_members(
+        session, chat_id=chat_id, members=[(tg_id, member.status, subscribed)]
+    )
+    return subscribed
 
 
 async def ensure_user(session: AsyncSession, message: Message) -> None:
@@ -125,12 +144,9 @@ async def giveaway_handler(message: Message, state: FSMContext):
             await session.commit()
             return
 
-        try:
-            chat_ref = normalize_channel(giveaway.required_channel)
-            member = await message.bot.get_chat_member(chat_ref, message.from_user.id)
-        except Exception:
-            member = None
-        if not is_subscribed(member):
+        if not await channel_subscribed(
+            session, message.bot, giveaway.required_channel, message.from_user.id
+        ):
             kb = InlineKeyboardBuilder()
             kb.button(
                 text="Проверить подписку", callback_data=f"check_sub:{giveaway.id}"
@@ -177,12 +193,13 @@ async def check_subscription(callback: CallbackQuery, state: FSMContext):
             await callback.answer()
             await session.commit()
             return
-        try:
-            chat_ref = normalize_channel(giveaway.required_channel)
-            member = await callback.bot.get_chat_member(chat_ref, callback.from_user.id)
-        except Exception:
-            member = None
-        if not is_subscribed(member):
+        if not await channel_subscribed(
+            session,
+            callback.bot,
+            giveaway.required_channel,
+            callback.from_user.id,
+            recheck=True,
+        ):
             await callback.answer("Подписка не найдена", show_alert=True)
             await session.commit()
             return
@@ -198,6 +215,18 @@ async def check_subscription(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
+@router.chat_member()
+async def channel_member_update(event: ChatMemberUpdated):
+    member = event.new_chat_member
+    async with SessionLocal() as session:
+        await record_channel_members(
+            session,
+            chat_id=event.chat.id,
+            members=[(member.user.id, member.status, is_subscribed(member))],
+        )
+        await session.commit()
+
+
 @router.message(EntryStates.waiting_screenshot)
 async def screenshot_handler(message: Message, state: FSMContext):
     if not message.photo:
@@ -521,11 +550,20 @@ async def moderation_edit(callback: CallbackQuery):
 
 def run() -> None:
     setup_logging()
-    bot = Bot(
-        token=settings.user_bot_token,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    bot = create_bot(settings.user_bot_token)
+    dp = Dispatcher(storage=create_storage())
+    admission = AdmissionControl(
+        concurrency=settings.user_bot_max_concurrency,
+        max_waiting=settings.user_bot_max_waiting,
+        max_wait=settings.user_bot_max_wait_seconds,
     )
-    dp = Dispatcher(storage=MemoryStorage())
+    reporter = LoadReporter(queue_depth=lambda: admission.waiting)
+    # Outer middlewares run in registration order: shed and coalesced updates
+    # never reach the reporter's latency average.
+    dp.update.outer_middleware(admission)
+    dp.update.outer_middleware(reporter)
+    dp.startup.register(reporter.start)
+    dp.shutdown.register(reporter.stop)
     dp.include_router(router)
     asyncio.run(dp.start_polling(bot))
 
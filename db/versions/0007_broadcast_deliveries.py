@@ -0,0 +1,41 @@
+"""broadcast deliveries ledger
+
+Revision ID: 0007_broadcast_deliveries
+Revises: 0006_auto_start
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0007_broadcast_deliveries"
+down_revision = "0006_auto_start"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    delivery_status = postgresql.ENUM(
+        "sent", "failed", "blocked", name="delivery_status", create_type=False
+    )
+    delivery_status.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        "broadcast_deliveries",
+        sa.Column(
+            "broadcast_id",
+            sa.Integer(),
+            sa.ForeignKey("broadcasts.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("tg_id", sa.BigInteger(), primary_key=True),
+        sa.Column("status", delivery_status, nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("broadcast_deliveries")
+    postgresql.ENUM(name="delivery_status").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,29 @@
+"""broadcast progress fields
+
+Revision ID: 0008_broadcast_progress
+Revises: 0007_broadcast_deliveries
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_broadcast_progress"
+down_revision = "0007_broadcast_deliveries"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("broadcasts", sa.Column("recipients_total", sa.Integer(), nullable=True))
+    op.add_column("broadcasts", sa.Column("send_rate", sa.Float(), nullable=True))
+    op.add_column(
+        "broadcasts",
+        sa.Column("progress_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("broadcasts", "progress_at")
+    op.drop_column("broadcasts", "send_rate")
+    op.drop_column("broadcasts", "recipients_total")
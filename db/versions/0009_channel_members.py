@@ -0,0 +1,30 @@
+"""channel members
+
+Revision ID: 0009_channel_members
+Revises: 0008_broadcast_progress
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009_channel_members"
+down_revision = "0008_broadcast_progress"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "channel_members",
+        sa.Column("chat_id", sa.BigInteger(), nullable=False),
+        sa.Column("tg_id", sa.BigInteger(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("is_member", sa.Boolean(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("chat_id", "tg_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("channel_members")
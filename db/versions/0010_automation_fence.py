@@ -0,0 +1,25 @@
+"""automation fencing token
+
+Revision ID: 0010_automation_fence
+Revises: 0009_channel_members
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010_automation_fence"
+down_revision = "0009_channel_members"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "giveaway_automation_settings",
+        sa.Column("fence_token", sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("giveaway_automation_settings", "fence_token")
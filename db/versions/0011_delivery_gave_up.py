@@ -0,0 +1,28 @@
+"""gave_up delivery status
+
+Revision ID: 0011_delivery_gave_up
+Revises: 0010_automation_fence
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011_delivery_gave_up"
+down_revision = "0010_automation_fence"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TYPE delivery_status ADD VALUE IF NOT EXISTS 'gave_up'")
+    op.add_column(
+        "broadcasts",
+        sa.Column("sent_gave_up", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("broadcasts", "sent_gave_up")
+    # Postgres cannot drop an enum value; fold the rows back into "failed".
+    op.execute("UPDATE broadcast_deliveries SET status = 'failed' WHERE status = 'gave_up'")
@@ -0,0 +1,22 @@
+"""broadcast error
+
+Revision ID: 0012_broadcast_error
+Revises: 0011_delivery_gave_up
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0012_broadcast_error"
+down_revision = "0011_delivery_gave_up"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("broadcasts", sa.Column("error", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("broadcasts", "error")
@@ -0,0 +1,22 @@
+"""broadcast staged file id
+
+Revision ID: 0013_broadcast_staged_file
+Revises: 0012_broadcast_error
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0013_broadcast_staged_file"
+down_revision = "0012_broadcast_error"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("broadcasts", sa.Column("staged_file_id", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("broadcasts", "staged_file_id")
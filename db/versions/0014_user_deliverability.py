@@ -0,0 +1,29 @@
+"""user deliverability state
+
+Revision ID: 0014_user_deliverability
+Revises: 0013_broadcast_staged_file
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0014_user_deliverability"
+down_revision = "0013_broadcast_staged_file"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "delivery_fail_streak", sa.Integer(), nullable=False, server_default=sa.text("0")
+        ),
+    )
+    op.add_column("users", sa.Column("last_delivery_error", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "last_delivery_error")
+    op.drop_column("users", "delivery_fail_streak")
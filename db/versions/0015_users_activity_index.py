@@ -0,0 +1,26 @@
+"""users activity order index
+
+Revision ID: 0015_users_activity_index
+Revises: 0014_user_deliverability
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0015_users_activity_index"
+down_revision = "0014_user_deliverability"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_users_activity",
+        "users",
+        [sa.text("last_seen_at DESC"), "delivery_fail_streak", "tg_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_activity", table_name="users")
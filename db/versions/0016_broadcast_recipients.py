@@ -0,0 +1,33 @@
+"""broadcast recipient order snapshot
+
+Revision ID: 0016_broadcast_recipients
+Revises: 0015_users_activity_index
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0016_broadcast_recipients"
+down_revision = "0015_users_activity_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "broadcast_recipients",
+        sa.Column(
+            "broadcast_id",
+            sa.Integer(),
+            sa.ForeignKey("broadcasts.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("position", sa.BigInteger(), nullable=False),
+        sa.Column("tg_id", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("broadcast_id", "position"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("broadcast_recipients")
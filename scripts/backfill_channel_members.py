@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from backend.app.core.config import settings
+from backend.app.core.telegram import create_bot, is_subscribed, resolve_chat_id
+from backend.app.db.session import SessionLocal
+from backend.app.models.user import User
+from backend.app.services.channel_member_service import record_channel_members
+from worker.recipients import check_members, iter_keyset_pages
+from worker.sender import TokenBucket
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Fill channel_members for known bot users (run once after migrating)"
+    )
+    parser.add_argument("--channel", default=settings.public_channel)
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    if not args.channel:
+        raise SystemExit("Channel is not configured")
+    bot = create_bot(settings.user_bot_token)
+    limiter = TokenBucket(settings.subscription_check_rate)
+    total = members = 0
+    try:
+        chat_id = await resolve_chat_id(bot, args.channel)
+        async with SessionLocal() as session:
+
+            async def fetch_page(after: int | None, limit: int) -> list[int]:
+                query = select(User.tg_id).order_by(User.tg_id).limit(limit)
+                if after is not None:
+                    query = query.where(User.tg_id > after)
+                return (await session.execute(query)).scalars().all()
+
+            async for page in iter_keyset_pages(fetch_page, settings.broadcast_page_size):
+                checked = []
+                async for tg_id, member in check_members(bot, chat_id, page, limiter):
+                    if member is not None:
+                        checked.append((tg_id, member.status, is_subscribed(member)))
+                await record_channel_members(session, chat_id=chat_id, members=checked)
+                await session.commit()
+                total += len(checked)
+                members += sum(1 for _, _, is_member in checked if is_member)
+                print(f"checked {total}, members {members}")
+    finally:
+        await bot.session.close()
+    print("Backfill done")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
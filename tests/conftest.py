@@ -0,0 +1,164 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import pytest
+
+ScriptHandler = Callable[["FakeRedis", list, list], Awaitable[Any]]
+
+
+def _encode(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class FakePipeline:
+    # Queues commands and runs them on execute(), like a non-transactional pipeline.
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self._calls: list[tuple[str, tuple, dict]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        return False
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list:
+        calls, self._calls = self._calls, []
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+
+class FakePubSub:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.channels: set[str] = set()
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self.channels.add(channel)
+        self.redis.subscribers.append(self)
+
+    async def unsubscribe(self, channel: str) -> None:
+        self.channels.discard(channel)
+
+    async def aclose(self) -> None:
+        if self in self.redis.subscribers:
+            self.redis.subscribers.remove(self)
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class FakeRedis:
+    # In-memory stand-in for redis.asyncio.Redis, covering the commands the app
+    # uses. Values come back as bytes, as from a real client. Lua scripts are
+    # mirrored by handlers registered in `scripts` under their source; calls to
+    # any other script are recorded and answer 0.
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.hashes: dict[str, dict[bytes, bytes]] = {}
+        self.ttls: dict[str, float] = {}
+        self.scripts: dict[str, ScriptHandler] = {}
+        self.script_calls: list[tuple[str, list, list]] = []
+        self.hset_calls: list[tuple[str, dict]] = []
+        self.subscribers: list[FakePubSub] = []
+        self.reads = 0
+        self.closed = False
+
+    def register_script(self, script: str):
+        async def run(keys: list, args: list) -> Any:
+            self.script_calls.append((script, list(keys), list(args)))
+            handler = self.scripts.get(script)
+            return await handler(self, keys, args) if handler else 0
+
+        return run
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self)
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+    async def get(self, key: str) -> bytes | None:
+        self.reads += 1
+        return self.values.get(key)
+
+    async def set(self, key: str, value: Any, ex: int | None = None, get: bool = False, **kwargs):
+        previous = self.values.get(key)
+        self.values[key] = _encode(value)
+        if ex is not None:
+            self.ttls[key] = ex
+        else:
+            self.ttls.pop(key, None)
+        return previous if get else True
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            removed += (self.values.pop(key, None) or self.hashes.pop(key, None)) is not None
+            self.ttls.pop(key, None)
+        return removed
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.values or key in self.hashes)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if not await self.exists(key):
+            return False
+        self.ttls[key] = seconds
+        return True
+
+    async def pexpire(self, key: str, ms: int) -> bool:
+        return await self.expire(key, ms / 1000)
+
+    async def hset(self, key: str, mapping: dict) -> int:
+        self.hset_calls.append((key, dict(mapping)))
+        self.hashes.setdefault(key, {}).update(
+            {_encode(field): _encode(value) for field, value in mapping.items()}
+        )
+        return len(mapping)
+
+    async def hget(self, key: str, field: str) -> bytes | None:
+        return self.hashes.get(key, {}).get(_encode(field))
+
+    async def hgetall(self, key: str) -> dict[bytes, bytes]:
+        self.reads += 1
+        return dict(self.hashes.get(key, {}))
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        fields = self.hashes.setdefault(key, {})
+        value = int(fields.get(_encode(field), b"0")) + amount
+        fields[_encode(field)] = _encode(value)
+        return value
+
+    async def hincrbyfloat(self, key: str, field: str, amount: float = 1.0) -> float:
+        fields = self.hashes.setdefault(key, {})
+        value = float(fields.get(_encode(field), b"0")) + amount
+        fields[_encode(field)] = _encode(value)
+        return value
+
+    async def publish(self, channel: str, message: Any) -> int:
+        receivers = [sub for sub in self.subscribers if channel in sub.channels]
+        for sub in receivers:
+            sub.messages.put_nowait({"type": "message", "channel": channel, "data": _encode(message)})
+        return len(receivers)
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+from aiogram.types import CallbackQuery, Update, User
+
+from bots.common import messages
+from bots.common.admission import AdmissionControl
+
+
+def _tap(update_id: int, user_id: int, data: str, answers: list) -> tuple[Update, dict]:
+    user = User(id=user_id, is_bot=False, first_name="u")
+    callback = CallbackQuery(id=str(update_id), from_user=user, chat_instance="c", data=data)
+
+    async def answer(text=None, **kwargs):
+        answers.append((user_id, text))
+
+    object.__setattr__(callback, "answer", answer)
+    return Update(update_id=update_id, callback_query=callback), {"event_from_user": user}
+
+
+@pytest.mark.asyncio
+async def test_duplicate_taps_are_coalesced():
+    answers: list = []
+    handled: list[int] = []
+    release = asyncio.Event()
+
+    async def handler(event, data):
+        handled.append(event.update_id)
+        await release.wait()
+
+    admission = AdmissionControl(concurrency=4, max_waiting=10, max_wait=1)
+    first = asyncio.create_task(admission(handler, *_tap(1, 7, "giveaway", answers)))
+    await asyncio.sleep(0)
+    await admission(handler, *_tap(2, 7, "giveaway", answers))
+    other = asyncio.create_task(admission(handler, *_tap(3, 8, "giveaway", answers)))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, other)
+
+    assert handled == [1, 3]
+    assert admission.coalesced == 1
+    assert answers == [(7, None)]
+
+
+@pytest.mark.asyncio
+async def test_overload_is_shed_with_try_again():
+    answers: list = []
+    release = asyncio.Event()
+    peak = running = 0
+
+    async def handler(event, data):
+        nonlocal peak, running
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        running -= 1
+
+    admission = AdmissionControl(concurrency=2, max_waiting=1, max_wait=0.1)
+    tasks = [
+        asyncio.create_task(admission(handler, *_tap(i, i, "status", answers)))
+        for i in range(5)
+    ]
+    await asyncio.sleep(0.2)
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert peak == 2
+    # Two ran, one queued until it timed out, two were refused straight away.
+    assert admission.shed == 3
+    assert sorted(text for _, text in answers) == [messages.TRY_AGAIN_LATER] * 3
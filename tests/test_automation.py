@@ -0,0 +1,186 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.app.db.base import Base
+from backend.app.models.giveaway_automation import GiveawayAutomationSettings
+from backend.app.services.automation_service import (
+    claim_automation_fence,
+    issue_automation_fence,
+)
+from worker import tasks
+from worker.tasks import (
+    _RELEASE_ETA_SCRIPT,
+    AUTOMATION_ETA_KEY,
+    _automation_rollover_check_async,
+    _next_rollover_at,
+    _schedule_automation_async,
+)
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def _settings(**overrides):
+    values = dict(
+        is_enabled=True,
+        required_channel="@channel",
+        rules_text="rules",
+        start_at=None,
+        day_of_month=20,
+        last_run_month=None,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+@pytest.mark.asyncio
+async def test_next_rollover_uses_start_at():
+    start_at = datetime(2026, 11, 1, 9, 0, tzinfo=timezone.utc)
+    assert await _next_rollover_at(_settings(start_at=start_at), NOW) == start_at
+
+
+@pytest.mark.asyncio
+async def test_next_rollover_skips_month_already_run():
+    assert await _next_rollover_at(_settings(), NOW) == datetime(
+        2026, 10, 20, 0, 5, tzinfo=timezone.utc
+    )
+    assert await _next_rollover_at(_settings(last_run_month="2026-10"), NOW) == datetime(
+        2026, 11, 20, 0, 5, tzinfo=timezone.utc
+    )
+
+
+@pytest.mark.asyncio
+async def test_next_rollover_none_when_disabled_or_incomplete():
+    assert await _next_rollover_at(_settings(is_enabled=False), NOW) is None
+    assert await _next_rollover_at(_settings(rules_text=""), NOW) is None
+
+
+async def _release_eta(redis, keys, args):
+    if redis.values.get(keys[0]) == str(args[0]).encode():
+        return await redis.delete(keys[0])
+    return 0
+
+
+@pytest.fixture
+def sweep(monkeypatch, fake_redis):
+    fake_redis.scripts[_RELEASE_ETA_SCRIPT] = _release_eta
+    enqueued = []
+
+    @asynccontextmanager
+    async def session():
+        async def commit():
+            pass
+
+        yield SimpleNamespace(commit=commit)
+
+    async def get_settings(session):
+        return _settings()
+
+    monkeypatch.setattr(tasks.runtime, "session", session)
+    monkeypatch.setattr(tasks.runtime, "redis", lambda: fake_redis)
+    monkeypatch.setattr(tasks, "get_automation_settings", get_settings)
+    monkeypatch.setattr(tasks, "utcnow", lambda: NOW)
+    monkeypatch.setattr(
+        tasks.automation_rollover_check,
+        "apply_async",
+        lambda args, eta: enqueued.append((args[0], eta)),
+    )
+    return enqueued
+
+
+@pytest.mark.asyncio
+async def test_sweep_enqueues_upcoming_check_once(monkeypatch, sweep):
+    run_at = NOW + timedelta(minutes=1)
+
+    async def next_rollover_at(settings_row, now):
+        return run_at
+
+    monkeypatch.setattr(tasks, "_next_rollover_at", next_rollover_at)
+    await _schedule_automation_async()
+    await _schedule_automation_async()
+    assert sweep == [(run_at.isoformat(), run_at)]
+
+
+@pytest.mark.asyncio
+async def test_sweep_reenqueues_overdue_check_that_never_completed(
+    monkeypatch, fake_redis, sweep
+):
+    run_at = NOW - timedelta(hours=1)
+
+    async def next_rollover_at(settings_row, now):
+        return run_at
+
+    monkeypatch.setattr(tasks, "_next_rollover_at", next_rollover_at)
+    # The check was enqueued earlier but its message was lost with a crashed worker.
+    await fake_redis.set(AUTOMATION_ETA_KEY, run_at.isoformat())
+    await _schedule_automation_async()
+    await _schedule_automation_async()
+    assert sweep == [(run_at.isoformat(), NOW), (run_at.isoformat(), NOW)]
+
+
+@pytest.mark.asyncio
+async def test_failed_check_frees_its_eta_slot(monkeypatch, fake_redis, sweep):
+    token = (NOW - timedelta(minutes=1)).isoformat()
+    await fake_redis.set(AUTOMATION_ETA_KEY, token)
+
+    class Lease:
+        acquired = True
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+    async def rollover(now, lease, fence):
+        raise RuntimeError("db down")
+
+    async def issue_fence(session):
+        return 1
+
+    monkeypatch.setattr(tasks, "LeaderLease", Lease)
+    monkeypatch.setattr(tasks, "issue_automation_fence", issue_fence)
+    monkeypatch.setattr(tasks, "_rollover", rollover)
+    with pytest.raises(RuntimeError):
+        await _automation_rollover_check_async(token)
+    assert await fake_redis.get(AUTOMATION_ETA_KEY) is None
+
+
+class SyncSession:
+    # Runs the automation queries on an in-memory SQLite database.
+    def __init__(self, session):
+        self.session = session
+
+    async def get(self, model, ident):
+        return self.session.get(model, ident)
+
+    def add(self, instance):
+        self.session.add(instance)
+
+    async def flush(self):
+        self.session.flush()
+
+    async def execute(self, query):
+        return self.session.execute(query)
+
+
+@pytest.mark.asyncio
+async def test_fence_refuses_holder_after_newer_token_is_issued():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[GiveawayAutomationSettings.__table__])
+    with Session(engine) as sync_session:
+        session = SyncSession(sync_session)
+        stale = await issue_automation_fence(session)
+        # The stale holder paused past its lease; a new holder took over.
+        current = await issue_automation_fence(session)
+
+        assert current == stale + 1
+        assert not await claim_automation_fence(session, token=stale)
+        assert await claim_automation_fence(session, token=current)
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from backend.app.core.bot_load import LoadPacer, LoadReporter
+from backend.app.core.config import settings
+
+
+@pytest.mark.asyncio
+async def test_reporter_keeps_publishing_while_handlers_stall(fake_redis):
+    redis = fake_redis
+    reporter = LoadReporter(queue_depth=lambda: 7, interval=0.05, redis=redis)
+    release = asyncio.Event()
+
+    async def stuck_handler(event, data):
+        await release.wait()
+
+    await reporter.start()
+    handling = asyncio.create_task(reporter(stuck_handler, object(), {}))
+    await asyncio.sleep(0.3)
+    try:
+        # Nothing completed, yet the bot reports itself busy on every tick.
+        assert len(redis.hset_calls) >= 3
+        _, last = redis.hset_calls[-1]
+        assert last["inflight"] == 1
+        assert last["queue_depth"] == 7
+        assert last["latency_ms"] >= 200
+    finally:
+        release.set()
+        await handling
+        await reporter.stop()
+    assert reporter.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_pacer_counts_queue_and_latency(monkeypatch, fake_redis):
+    monkeypatch.setattr(settings, "announce_pace_max_inflight", 20)
+    monkeypatch.setattr(settings, "announce_pace_max_latency_ms", 1000)
+    redis = fake_redis
+    key = "bot:load:user"
+
+    def load(inflight, queue_depth, latency_ms):
+        redis.hashes[key] = {
+            b"inflight": str(inflight).encode(),
+            b"queue_depth": str(queue_depth).encode(),
+            b"latency_ms": str(latency_ms).encode(),
+        }
+        return LoadPacer(redis, key)
+
+    assert not await LoadPacer(redis, key).overloaded()
+    assert not await load(5, 5, 200).overloaded()
+    assert await load(10, 15, 200).overloaded()
+    assert await load(2, 0, 1500).overloaded()
+
+
+@pytest.mark.asyncio
+async def test_pacer_reads_redis_once_per_interval(fake_redis):
+    pacer = LoadPacer(fake_redis, interval=60)
+    for _ in range(100):
+        await pacer.overloaded()
+    assert fake_redis.reads == 1
@@ -0,0 +1,37 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.services import broadcast_signals
+from backend.app.services.broadcast_signals import CancelWatcher, publish_cancel
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch, fake_redis):
+    # publish_cancel opens its own client; hand it the same fake.
+    client = SimpleNamespace(from_url=lambda url: fake_redis)
+    monkeypatch.setattr(broadcast_signals, "Redis", client)
+    return fake_redis
+
+
+@pytest.mark.asyncio
+async def test_watcher_sees_cancel_published_before_it_started(redis):
+    await publish_cancel(7)
+    assert redis.closed
+
+    async with CancelWatcher(redis, 7) as watcher:
+        assert watcher.cancelled
+    assert redis.subscribers == []
+
+
+@pytest.mark.asyncio
+async def test_watcher_ignores_other_broadcasts(redis):
+    async with CancelWatcher(redis, 7) as watcher:
+        await publish_cancel(8)
+        await asyncio.sleep(0.05)
+        assert not watcher.cancelled
+
+        await publish_cancel(7)
+        await asyncio.sleep(0.05)
+        assert watcher.cancelled
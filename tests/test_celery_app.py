@@ -0,0 +1,21 @@
+import worker.tasks  # noqa: F401  registers the tasks
+from worker.celery_app import BROADCASTS_QUEUE, celery_app
+
+
+def test_bulk_text_sends_go_to_the_broadcasts_queue():
+    routes = celery_app.conf.task_routes
+    assert routes["worker.tasks.send_broadcast_text"]["queue"] == BROADCASTS_QUEUE
+    assert routes["worker.tasks.send_broadcast_text_exclude"]["queue"] == BROADCASTS_QUEUE
+
+
+def test_ack_policy_follows_the_queue():
+    tasks = celery_app.tasks
+    for name in (
+        "worker.tasks.send_broadcast",
+        "worker.tasks.send_broadcast_shard",
+        "worker.tasks.automation_rollover_check",
+    ):
+        assert tasks[name].acks_late and tasks[name].reject_on_worker_lost
+    # Non-resumable sends are acknowledged up front even on the broadcasts queue.
+    for name in ("worker.tasks.send_broadcast_text", "worker.tasks.send_broadcast_sharded"):
+        assert not tasks[name].acks_late
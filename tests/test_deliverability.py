@@ -0,0 +1,103 @@
+import pytest
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.methods import SendMessage
+from sqlalchemy.dialects import postgresql
+
+from backend.app.models.enums import DeliveryStatus
+from backend.app.services.user_service import mark_blocked_many, record_delivery_outcomes
+from worker.sender import BroadcastSender, error_label
+from worker.tasks import delivery_outcomes
+
+
+def _bad_request(message: str) -> TelegramBadRequest:
+    return TelegramBadRequest(SendMessage(chat_id=1, text="x"), message)
+
+
+def test_only_recipient_errors_count_towards_the_streak():
+    blocked = TelegramForbiddenError(SendMessage(chat_id=2, text="x"), "blocked")
+    results = [
+        (1, DeliveryStatus.sent, None),
+        (2, DeliveryStatus.blocked, error_label(blocked)),
+        (3, DeliveryStatus.failed, error_label(_bad_request("Bad Request: chat not found"))),
+        (4, DeliveryStatus.failed, error_label(_bad_request("Bad Request: can't parse entities"))),
+        (5, DeliveryStatus.failed, error_label(_bad_request("Bad Request: wrong file identifier"))),
+        (6, DeliveryStatus.failed, error_label(RuntimeError("boom"))),
+        (7, DeliveryStatus.gave_up, "TelegramNetworkError"),
+    ]
+    delivered, failures = delivery_outcomes(results)
+    assert delivered == [1]
+    assert failures == [
+        (2, "TelegramForbiddenError"),
+        (3, "TelegramBadRequest: chat not found"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_tripped_run_reports_only_after_the_verdict():
+    async def send(tg_id: int) -> None:
+        raise _bad_request("Bad Request: can't parse entities")
+
+    verdicts = []
+    sender = BroadcastSender(
+        rate=1000,
+        concurrency=4,
+        check_every=1,
+        flush_every=1,
+        flush_interval=0,
+        breaker_window=20,
+        breaker_threshold=0.5,
+    )
+
+    async def on_results(results) -> None:
+        verdicts.append(sender.stats.tripped)
+
+    stats = await sender.run(range(1000), send, on_results=on_results)
+    assert stats.tripped
+    # The checkpoint skips streak updates for every batch of a tripped run.
+    assert verdicts and all(verdicts)
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        compiled = statement.compile(dialect=postgresql.dialect())
+        self.statements.append((str(compiled), compiled.params))
+
+
+@pytest.mark.asyncio
+async def test_delivery_outcomes_reset_and_increment_streaks():
+    session = RecordingSession()
+    await record_delivery_outcomes(
+        session,
+        delivered=[1, 2],
+        failures=[(3, "TelegramForbiddenError"), (4, "TelegramForbiddenError"), (5, None)],
+    )
+    (reset_sql, reset), (forbidden_sql, forbidden), (_, other) = session.statements
+    assert reset["tg_ids"] == [1, 2]
+    assert reset["delivery_fail_streak"] == 0
+    assert "delivery_fail_streak > " in reset_sql
+    assert forbidden["tg_ids"] == [3, 4]
+    assert forbidden["last_delivery_error"] == "TelegramForbiddenError"
+    assert "delivery_fail_streak=(users.delivery_fail_streak + " in forbidden_sql
+    assert other["tg_ids"] == [5]
+
+
+@pytest.mark.asyncio
+async def test_nothing_to_record_issues_no_statements():
+    session = RecordingSession()
+    await record_delivery_outcomes(session, delivered=[], failures=[])
+    assert session.statements == []
+
+
+@pytest.mark.asyncio
+async def test_mark_blocked_many_updates_in_one_statement():
+    session = RecordingSession()
+    await mark_blocked_many(session, tg_ids=[3, 4, 5])
+    await mark_blocked_many(session, tg_ids=[])
+    ((sql, params),) = session.statements
+    assert sql.startswith("UPDATE users SET is_blocked=")
+    assert sql.endswith("WHERE users.tg_id = ANY (%(tg_ids)s::BIGINT[])")
+    assert params["tg_ids"] == [3, 4, 5]
+    assert params["is_blocked"] is True
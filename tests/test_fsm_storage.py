@@ -0,0 +1,67 @@
+import pytest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+
+from backend.app.models.enums import BroadcastPayloadType, BroadcastSegment
+from bots.admin_bot.bot import parse_date_only
+from bots.common.storage import GroupTTLStorage
+
+
+class EntryStates(StatesGroup):
+    waiting_fio = State()
+
+
+class DrawStates(StatesGroup):
+    count = State()
+
+
+@pytest.mark.asyncio
+async def test_state_and_data_expire_by_state_group(fake_redis):
+    redis = fake_redis
+    storage = GroupTTLStorage(
+        redis, ttls={"EntryStates": 86400, "DrawStates": 900}, default_ttl=60
+    )
+    user_bot = StorageKey(bot_id=1, chat_id=5, user_id=5)
+    admin_bot = StorageKey(bot_id=2, chat_id=5, user_id=5)
+
+    await storage.set_state(user_bot, EntryStates.waiting_fio)
+    await storage.set_data(user_bot, {"screenshot": "file"})
+    await storage.set_data(admin_bot, {"count": 1})
+    await storage.set_state(admin_bot, DrawStates.count)
+
+    assert await storage.get_state(user_bot) == "EntryStates:waiting_fio"
+    assert await storage.get_data(user_bot) == {"screenshot": "file"}
+    # Same person in both bots keeps two separate conversations.
+    assert await storage.get_data(admin_bot) == {"count": 1}
+    assert redis.ttls == {
+        "fsm:1:5:5:state": 86400,
+        "fsm:1:5:5:data": 86400,
+        "fsm:2:5:5:data": 900,
+        "fsm:2:5:5:state": 900,
+    }
+
+    await storage.set_state(user_bot, None)
+    assert await storage.get_state(user_bot) is None
+
+
+@pytest.mark.asyncio
+async def test_admin_flow_data_round_trips_through_redis(fake_redis):
+    storage = GroupTTLStorage(fake_redis, ttls={}, default_ttl=60)
+    state = FSMContext(storage, StorageKey(bot_id=2, chat_id=5, user_id=5))
+
+    # Same values the admin bot's giveaway and broadcast flows store.
+    await state.update_data(draw_at=parse_date_only("22.01.2026"))
+    await state.update_data(
+        payload_type=BroadcastPayloadType.photo,
+        payload_file_id="file",
+        text=None,
+        segment=BroadcastSegment.all_bot_users.value,
+    )
+    data = await state.get_data()
+
+    assert data["draw_at"].strftime("%d.%m.%Y") == "22.01.2026"
+    assert data["payload_type"] is BroadcastPayloadType.photo
+    assert data["payload_type"].value == "photo"
+    assert data["segment"] == "all_bot_users"
+    assert data["text"] is None
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from worker.lease import _ACQUIRE_SCRIPT, _RENEW_SCRIPT, LeaderLease, LeaseLost
+
+
+async def _acquire(redis, keys, args):
+    # Mirrors the Lua scripts on the fake's values; expiry is driven by the test.
+    if await redis.exists(keys[0]):
+        return 0
+    token = int(redis.values.get(keys[1], b"0")) + 1
+    await redis.set(keys[1], token)
+    await redis.set(keys[0], token)
+    return token
+
+
+async def _renew(redis, keys, args):
+    if redis.values.get(keys[0]) != str(args[0]).encode():
+        return 0
+    if int(args[1]) == 0:
+        await redis.delete(keys[0])
+    return 1
+
+
+@pytest.fixture
+def redis(fake_redis):
+    fake_redis.scripts[_ACQUIRE_SCRIPT] = _acquire
+    fake_redis.scripts[_RENEW_SCRIPT] = _renew
+    return fake_redis
+
+
+@pytest.mark.asyncio
+async def test_lease_is_exclusive_and_fenced(redis):
+    async with LeaderLease(redis, "job", ttl=5) as first:
+        async with LeaderLease(redis, "job", ttl=5) as second:
+            assert first.acquired
+            assert not second.acquired
+    async with LeaderLease(redis, "job", ttl=5) as third:
+        assert third.token > first.token
+
+
+@pytest.mark.asyncio
+async def test_lease_reports_loss_on_failed_renewal(redis):
+    async with LeaderLease(redis, "job", ttl=1) as lease:
+        lease.ensure()
+        # The key expired and another replica took it over.
+        redis.values["lease:job"] = b"99"
+        await asyncio.sleep(0.4)
+        with pytest.raises(LeaseLost):
+            lease.ensure()
+    assert redis.values["lease:job"] == b"99"
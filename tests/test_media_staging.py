@@ -0,0 +1,53 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.core.config import settings
+from backend.app.models.broadcast import Broadcast
+from backend.app.models.enums import BroadcastPayloadType, BroadcastSegment
+from worker import runtime, tasks
+
+
+class FakeAdminBot:
+    async def get_file(self, file_id):
+        return SimpleNamespace(file_path=f"photos/{file_id}.jpg")
+
+    async def download_file(self, path):
+        return io.BytesIO(b"jpeg")
+
+
+class FakeUserBot:
+    def __init__(self):
+        self.uploads = []
+        self.deleted = []
+
+    async def send_photo(self, chat_id, photo, **kwargs):
+        self.uploads.append((chat_id, photo.filename, photo.data))
+        sizes = [SimpleNamespace(file_id="small"), SimpleNamespace(file_id="user-bot-id")]
+        return SimpleNamespace(message_id=7, photo=sizes)
+
+    async def delete_message(self, chat_id, message_id):
+        self.deleted.append((chat_id, message_id))
+
+
+@pytest.mark.asyncio
+async def test_media_is_restaged_through_user_bot(monkeypatch):
+    monkeypatch.setattr(settings, "admin_bot_token", "1:ADMIN")
+    monkeypatch.setattr(settings, "user_bot_token", "2:USER")
+    monkeypatch.setattr(settings, "broadcast_preflight_chat_id", -100)
+    user_bot = FakeUserBot()
+    bots = {"1:ADMIN": FakeAdminBot(), "2:USER": user_bot}
+    monkeypatch.setattr(runtime, "bot", bots.__getitem__)
+    broadcast = Broadcast(
+        created_by=42,
+        segment=BroadcastSegment.all_bot_users,
+        payload_type=BroadcastPayloadType.photo,
+        payload_file_id="admin-bot-id",
+    )
+
+    await tasks._stage_media(broadcast)
+
+    assert broadcast.staged_file_id == "user-bot-id"
+    assert user_bot.uploads == [(-100, "admin-bot-id.jpg", b"jpeg")]
+    assert user_bot.deleted == [(-100, 7)]
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+from backend.app.models.broadcast import Broadcast
+from backend.app.models.enums import DeliveryStatus
+from backend.app.services.delivery_service import progress_delta
+from backend.app.web.routes import broadcast_progress
+
+SENT = DeliveryStatus.sent
+FAILED = DeliveryStatus.failed
+GAVE_UP = DeliveryStatus.gave_up
+
+
+def test_resumed_recipients_are_not_counted_twice():
+    first_run = [(tg_id, SENT, None) for tg_id in range(8)] + [
+        (8, FAILED, "TelegramBadRequest"),
+        (9, GAVE_UP, "TelegramNetworkError"),
+    ]
+    assert progress_delta(first_run, {}) == (8, 2)
+
+    ledger = {tg_id: status for tg_id, status, _ in first_run}
+    # The resume retries only the two unfinished recipients.
+    second_run = [(8, SENT, None), (9, GAVE_UP, "TelegramNetworkError")]
+    assert progress_delta(second_run, ledger) == (1, -1)
+
+
+def test_progress_stays_within_total_after_resume():
+    started = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+    broadcast = Broadcast(
+        sent_ok=8 + 1,
+        sent_fail=2 - 1,
+        recipients_total=10,
+        started_at=started,
+        progress_at=started + timedelta(seconds=10),
+    )
+    progress = broadcast_progress(broadcast)
+    assert progress["percent"] == 100.0
+    assert progress["eta"] == broadcast.progress_at.isoformat()
+
+
+def test_progress_estimates_finish_from_average_rate():
+    started = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+    broadcast = Broadcast(
+        sent_ok=200,
+        sent_fail=50,
+        recipients_total=1000,
+        started_at=started,
+        progress_at=started + timedelta(seconds=10),
+    )
+    progress = broadcast_progress(broadcast)
+    assert progress["percent"] == 25.0
+    # 25 msg/s, 750 left.
+    assert progress["eta"] == (started + timedelta(seconds=40)).isoformat()
+
+
+def test_progress_unknown_without_total():
+    assert broadcast_progress(Broadcast(sent_ok=5, sent_fail=0)) == {
+        "percent": None,
+        "eta": None,
+    }
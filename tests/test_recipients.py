@@ -0,0 +1,164 @@
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from aiogram.enums import ChatMemberStatus
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import settings
+from backend.app.core.telegram import is_subscribed
+from backend.app.db.base import Base
+from backend.app.models.broadcast_recipient import BroadcastRecipient
+from backend.app.models.user import User
+from worker.recipients import (
+    check_members,
+    deliverable,
+    iter_user_ids,
+    snapshot_user_ids,
+)
+from worker.sender import TokenBucket
+
+@pytest.mark.asyncio
+async def test_membership_checks_run_concurrently(monkeypatch):
+    monkeypatch.setattr(settings, "subscription_check_concurrency", 10)
+    in_flight = 0
+    peak = 0
+
+    class FakeBot:
+        async def get_chat_member(self, chat_id, user_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            status = ChatMemberStatus.LEFT if user_id % 2 else ChatMemberStatus.MEMBER
+            return SimpleNamespace(status=status)
+
+    started = time.monotonic()
+    verified = [
+        tg_id
+        async for tg_id, member in check_members(
+            FakeBot(), "@channel", list(range(50)), TokenBucket(1000)
+        )
+        if is_subscribed(member)
+    ]
+    elapsed = time.monotonic() - started
+
+    assert sorted(verified) == list(range(0, 50, 2))
+    assert peak == 10
+    # Sequential checks would take at least 0.5s.
+    assert elapsed < 0.3
+
+
+class SyncSession:
+    # Runs the recipient queries on an in-memory SQLite database.
+    def __init__(self, session):
+        self.session = session
+        self.executes = 0
+
+    async def execute(self, query):
+        self.executes += 1
+        return self.session.execute(query)
+
+
+USERS = 100_000
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def user_db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[User.__table__, BroadcastRecipient.__table__])
+    with Session(engine) as sync_session:
+        sync_session.execute(
+            insert(User),
+            [
+                {"tg_id": tg_id, "first_seen_at": NOW, "last_seen_at": NOW, "is_blocked": False}
+                for tg_id in range(1, USERS + 1)
+            ],
+        )
+        sync_session.commit()
+        yield sync_session
+
+
+@pytest.mark.asyncio
+async def test_user_stream_keeps_memory_flat(user_db):
+    session = SyncSession(user_db)
+    query = select(User.tg_id).where(deliverable())
+    await snapshot_user_ids(session, 1, query)
+    session.executes = 0
+
+    tracemalloc.start()
+    try:
+        count = 0
+        last = None
+        async for tg_id in iter_user_ids(session, query, 1, page_size=1000):
+            last = tg_id
+            count += 1
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert count == USERS
+    assert last == USERS
+    assert session.executes == USERS // 1000 + 1
+    # Fetching all 100k rows in one query peaks at about 20 MB.
+    assert peak < 2 * 1024 * 1024
+
+
+@pytest.mark.asyncio
+async def test_user_stream_yields_after_first_page(user_db):
+    session = SyncSession(user_db)
+    query = select(User.tg_id).where(deliverable())
+    await snapshot_user_ids(session, 1, query)
+    session.executes = 0
+
+    stream = iter_user_ids(session, query, 1, page_size=500)
+    assert await anext(stream) == 1
+    assert session.executes == 1
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_send_order_is_frozen_while_users_change():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[User.__table__, BroadcastRecipient.__table__])
+    now = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    with Session(engine) as sync_session:
+        sync_session.add_all(
+            User(
+                tg_id=tg_id,
+                first_seen_at=now,
+                last_seen_at=now - timedelta(days=tg_id),
+                is_blocked=False,
+                delivery_fail_streak=tg_id % 2,
+            )
+            for tg_id in range(1, 11)
+        )
+        sync_session.commit()
+        session = SyncSession(sync_session)
+        query = select(User.tg_id).where(deliverable())
+        await snapshot_user_ids(session, 1, query)
+
+        sent = []
+        async for tg_id in iter_user_ids(session, query, 1, page_size=3):
+            sent.append(tg_id)
+            if len(sent) == 3:
+                # A not yet reached user writes to the bot (jumps to the front) and
+                # users already sent fail their delivery (move further back).
+                sync_session.execute(
+                    update(User)
+                    .where(User.tg_id == 9)
+                    .values(last_seen_at=now, delivery_fail_streak=0)
+                )
+                sync_session.execute(
+                    update(User)
+                    .where(User.tg_id.in_(sent))
+                    .values(delivery_fail_streak=User.delivery_fail_streak + 1)
+                )
+
+    assert sent == list(range(1, 11))
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+from backend.app.core.config import settings
+from worker import runtime
+
+
+def test_tasks_share_one_loop_and_bot():
+    async def current():
+        return asyncio.get_running_loop(), runtime.bot("123456:TEST")
+
+    try:
+        first_loop, first_bot = runtime.run(current())
+        second_loop, second_bot = runtime.run(current())
+        assert first_loop is second_loop
+        assert first_bot is second_bot
+    finally:
+        runtime.shutdown()
+
+    assert first_loop.is_closed()
+    assert runtime._bots == {}
+
+
+def test_pool_threads_run_concurrently_up_to_limit(monkeypatch):
+    monkeypatch.setattr(settings, "worker_async_concurrency", 3)
+    in_flight = 0
+    peak = 0
+
+    async def task():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+
+    # Celery's threads pool calls the sync task body from several threads at once.
+    threads = [threading.Thread(target=runtime.run, args=(task(),)) for _ in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        runtime.shutdown()
+
+    assert peak == 3
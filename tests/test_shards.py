@@ -0,0 +1,21 @@
+from worker import runtime, tasks
+
+
+def test_failing_shard_still_completes_the_chord(monkeypatch):
+    recorded = []
+
+    async def broken_shard(broadcast_id, tg_id_from, tg_id_to):
+        raise ConnectionError("db went away")
+
+    async def record_error(broadcast_id, error):
+        recorded.append((broadcast_id, error))
+
+    monkeypatch.setattr(tasks, "_send_broadcast_shard_async", broken_shard)
+    monkeypatch.setattr(tasks, "_record_error", record_error)
+    try:
+        # Returning normally is what lets the chord run finalize_broadcast.
+        assert tasks.send_broadcast_shard(7, 100, 200) is None
+    finally:
+        runtime.shutdown()
+
+    assert recorded == [(7, "часть получателей не обработана (100–200): ConnectionError")]
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import GetUpdates, SendMessage
+
+from backend.app.core import telegram
+from backend.app.core.config import settings
+from backend.app.core.telegram import _BUCKET_SCRIPT, Lane, RateGovernor, send_lane
+
+TOKEN = "123:secret"
+
+
+@pytest.mark.asyncio
+async def test_bulk_lane_reaches_spawned_send_tasks(monkeypatch):
+    monkeypatch.setattr(settings, "telegram_bulk_reserve", 6)
+    monkeypatch.setattr(settings, "telegram_transactional_reserve", 2)
+
+    async def reserve() -> float:
+        return telegram._lane_reserve(telegram._lane.get())
+
+    assert await reserve() == 0
+    with send_lane(Lane.bulk):
+        # BroadcastSender sends from its own tasks; they must inherit the lane.
+        assert await asyncio.create_task(reserve()) == 6
+        with send_lane(Lane.transactional):
+            assert await reserve() == 2
+        assert await reserve() == 6
+    assert await reserve() == 0
+
+
+@pytest.fixture
+def governor(monkeypatch, fake_redis):
+    monkeypatch.setattr(settings, "telegram_bulk_reserve", 6)
+    monkeypatch.setattr(telegram, "shared_redis", lambda: fake_redis)
+    return RateGovernor(TOKEN)
+
+
+def _bucket_calls(redis, key):
+    return [args for script, keys, args in redis.script_calls if keys == [key]]
+
+
+@pytest.mark.asyncio
+async def test_governor_acquires_with_lane_reserve(fake_redis, governor):
+    async def make_request(bot, method):
+        return "ok"
+
+    with send_lane(Lane.bulk):
+        assert await governor(make_request, None, SendMessage(chat_id=5, text="x")) == "ok"
+
+    rate = settings.telegram_global_rate
+    # rate, capacity, pause, reserve
+    assert _bucket_calls(fake_redis, "tg:rate:123") == [[rate, max(rate, 7), 0, 6]]
+    assert len(_bucket_calls(fake_redis, "tg:rate:123:chat:5")) == 1
+    stats = fake_redis.hashes["tg:stats:123"]
+    assert stats[b"requests"] == b"1"
+    assert stats[b"requests:bulk"] == b"1"
+
+
+@pytest.mark.asyncio
+async def test_governor_pauses_shared_bucket_on_retry_after(fake_redis, governor):
+    method = SendMessage(chat_id=5, text="x")
+
+    async def make_request(bot, method):
+        raise TelegramRetryAfter(method, "Too Many Requests", retry_after=7)
+
+    with pytest.raises(TelegramRetryAfter):
+        await governor(make_request, None, method)
+    await asyncio.sleep(0)
+
+    pauses = [args for args in _bucket_calls(fake_redis, "tg:rate:123") if args[2] > 0]
+    assert [args[2] for args in pauses] == [7]
+    assert all(script == _BUCKET_SCRIPT for script, _, _ in fake_redis.script_calls)
+    assert fake_redis.hashes["tg:stats:123"][b"retry_after"] == b"1"
+
+
+@pytest.mark.asyncio
+async def test_governor_lets_get_updates_through(fake_redis, governor):
+    async def make_request(bot, method):
+        return []
+
+    assert await governor(make_request, None, GetUpdates(timeout=30)) == []
+    assert fake_redis.script_calls == []
+    assert fake_redis.hashes == {}
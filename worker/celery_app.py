@@ -1,5 +1,5 @@
 from celery import Celery
-from celery.schedules import crontab
+from kombu import Queue
 
 from backend.app.core.config import settings
 from backend.app.core.logging import setup_logging
@@ -13,16 +13,69 @@ celery_app = Celery(
 
 setup_logging()
 
+# Long bulk sends and scheduled automation are consumed by separate workers (see
+# docker-compose), so a running broadcast never delays the monthly rollover.
+BROADCASTS_QUEUE = "broadcasts"
+AUTOMATION_QUEUE = "automation"
+
+TASK_ROUTES = {
+    "worker.tasks.send_broadcast": BROADCASTS_QUEUE,
+    "worker.tasks.send_broadcast_sharded": BROADCASTS_QUEUE,
+    "worker.tasks.send_broadcast_shard": BROADCASTS_QUEUE,
+    "worker.tasks.finalize_broadcast": BROADCASTS_QUEUE,
+    # Full-audience text sends are bulk traffic too, whoever queues them.
+    "worker.tasks.send_broadcast_text": BROADCASTS_QUEUE,
+    "worker.tasks.send_broadcast_text_exclude": BROADCASTS_QUEUE,
+    "worker.tasks.automation_rollover_check": AUTOMATION_QUEUE,
+    "worker.tasks.schedule_automation": AUTOMATION_QUEUE,
+}
+
+# Ack policy per queue. acks_late tasks are acknowledged after they finish and
+# handed to another worker if theirs dies; they must be able to pick up where the
+# lost run stopped. After a hard crash (killed process, lost host) the broker only
+# redelivers them once celery_visibility_timeout (12h by default) has passed.
+# Prefetch is 1 on both workers in docker-compose, so nothing waits behind a long task.
+QUEUE_ACKS_LATE = {
+    BROADCASTS_QUEUE: True,
+    AUTOMATION_QUEUE: True,
+}
+# These start a new send on every run, so a redelivery would send it twice.
+EARLY_ACK_TASKS = {
+    "worker.tasks.send_broadcast_sharded",
+    "worker.tasks.send_broadcast_text",
+    "worker.tasks.send_broadcast_text_exclude",
+}
+
+
+def _ack_policy(task_name: str) -> dict:
+    acks_late = QUEUE_ACKS_LATE[TASK_ROUTES[task_name]] and task_name not in EARLY_ACK_TASKS
+    return {"acks_late": acks_late, "reject_on_worker_lost": acks_late}
+
+
 celery_app.conf.update(
     task_serializer="json",
     accept_content=["json"],
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    task_queues=(
+        Queue(BROADCASTS_QUEUE),
+        Queue(AUTOMATION_QUEUE),
+    ),
+    task_default_queue=BROADCASTS_QUEUE,
+    task_routes={name: {"queue": queue} for name, queue in TASK_ROUTES.items()},
+    task_annotations={name: _ack_policy(name) for name in TASK_ROUTES},
+    # Default for workers started without --prefetch-multiplier.
+    worker_prefetch_multiplier=1,
+    # acks_late broadcasts run for hours; Redis must not hand them to another
+    # worker while the first one is still sending.
+    broker_transport_options={"visibility_timeout": settings.celery_visibility_timeout},
+    # Rollover checks are enqueued with an ETA (worker.tasks.schedule_automation);
+    # this sweep only catches missed or not yet scheduled runs.
     beat_schedule={
-        "automation-rollover-daily": {
-            "task": "worker.tasks.automation_rollover_check",
-            "schedule": crontab(minute="*/1"),
+        "automation-sweep": {
+            "task": "worker.tasks.schedule_automation",
+            "schedule": settings.automation_sweep_minutes * 60,
         }
     },
 )
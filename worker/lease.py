@@ -0,0 +1,75 @@
+import asyncio
+
+from redis.asyncio import Redis
+
+# KEYS[1] lease key, KEYS[2] fencing counter; ARGV[1] ttl ms.
+# Returns the new fencing token, or 0 when someone else holds the lease.
+_ACQUIRE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  return 0
+end
+local token = redis.call('INCR', KEYS[2])
+redis.call('SET', KEYS[1], token, 'PX', ARGV[1])
+return token
+"""
+
+# KEYS[1] lease key; ARGV[1] token, ARGV[2] ttl ms (0 releases).
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+  return 0
+end
+if tonumber(ARGV[2]) == 0 then
+  redis.call('DEL', KEYS[1])
+else
+  redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+
+class LeaseLost(Exception):
+    pass
+
+
+class LeaderLease:
+    # Only one holder per name across all worker replicas. The token grows with
+    # every acquisition, so writes can be fenced against a holder whose lease ran
+    # out while it was paused.
+    def __init__(self, redis: Redis, name: str, ttl: float) -> None:
+        self.key = f"lease:{name}"
+        self.ttl_ms = max(int(ttl * 1000), 1000)
+        self.token = 0
+        self.lost = False
+        self._acquire = redis.register_script(_ACQUIRE_SCRIPT)
+        self._renew = redis.register_script(_RENEW_SCRIPT)
+        self._renewal: asyncio.Task | None = None
+
+    @property
+    def acquired(self) -> bool:
+        return self.token > 0
+
+    def ensure(self) -> None:
+        if self.lost:
+            raise LeaseLost(self.key)
+
+    async def __aenter__(self) -> "LeaderLease":
+        self.token = int(
+            await self._acquire(keys=[self.key, f"{self.key}:fence"], args=[self.ttl_ms])
+        )
+        if self.acquired:
+            self._renewal = asyncio.create_task(self._keep_alive())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if not self.acquired:
+            return
+        self._renewal.cancel()
+        if not self.lost:
+            await self._renew(keys=[self.key], args=[self.token, 0])
+
+    async def _keep_alive(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl_ms / 3000)
+            if not await self._renew(keys=[self.key], args=[self.token, self.ttl_ms]):
+                self.lost = True
+                return
@@ -0,0 +1,252 @@
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from datetime import timedelta
+from typing import Any
+
+from aiogram import Bot
+from aiogram.types import ChatMember
+from sqlalchemy import Select, and_, delete, func, insert, literal, select
+
+from backend.app.core.config import settings
+from backend.app.core.telegram import is_subscribed, resolve_chat_id
+from backend.app.core.time import utcnow
+from backend.app.models.broadcast import Broadcast
+from backend.app.models.broadcast_delivery import BroadcastDelivery
+from backend.app.models.broadcast_recipient import BroadcastRecipient
+from backend.app.models.channel_member import ChannelMember
+from backend.app.models.entry import Entry
+from backend.app.models.enums import BroadcastSegment, EntryStatus
+from backend.app.services.channel_member_service import record_channel_members
+from backend.app.services.delivery_service import FINAL_STATUSES
+from backend.app.services.giveaway_service import get_active_giveaway
+from backend.app.models.user import User
+from backend.app.services.user_service import mark_subscribed_verified_many
+from worker.sender import TokenBucket
+
+
+def undelivered(broadcast_id: int):
+    return ~(
+        select(BroadcastDelivery.tg_id)
+        .where(
+            BroadcastDelivery.broadcast_id == broadcast_id,
+            BroadcastDelivery.tg_id == User.tg_id,
+            BroadcastDelivery.status.in_(FINAL_STATUSES),
+        )
+        .exists()
+    )
+
+
+async def iter_keyset_pages(
+    fetch_page: Callable[[Any, int], Awaitable[Sequence[Any]]],
+    page_size: int,
+    key: Callable[[Any], Any] = lambda item: item,
+) -> AsyncIterator[Sequence[Any]]:
+    # Keyset paging instead of a server-side cursor: the send loop commits its
+    # checkpoints on the same session, which would close an open cursor.
+    after = None
+    while True:
+        page = await fetch_page(after, page_size)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        after = key(page[-1])
+
+
+# Recently active users first, then the ones whose last deliveries went through,
+# so a time-sensitive broadcast reaches live chats before the long tail.
+_ACTIVITY_ORDER = (User.last_seen_at.desc(), User.delivery_fail_streak, User.tg_id)
+
+
+async def snapshot_user_ids(session, broadcast_id: int, query: Select) -> None:
+    # The order is taken once, at the start: a user who writes to the bot or fails a
+    # delivery mid-run would otherwise move across the paging cursor and be skipped
+    # or sent twice.
+    ranked = query.add_columns(
+        func.row_number().over(order_by=_ACTIVITY_ORDER).label("position")
+    ).subquery()
+    await session.execute(
+        insert(BroadcastRecipient).from_select(
+            ["broadcast_id", "tg_id", "position"],
+            select(literal(broadcast_id), ranked.c.tg_id, ranked.c.position),
+        )
+    )
+
+
+async def snapshot_recipients(session, broadcast: Broadcast) -> None:
+    # Idempotent, so a resumed broadcast keeps the order it started with.
+    existing = await session.execute(
+        select(BroadcastRecipient.position)
+        .where(BroadcastRecipient.broadcast_id == broadcast.id)
+        .limit(1)
+    )
+    if existing.first() is not None:
+        return
+    query = await _segment_query(session, broadcast)
+    if query is not None:
+        await snapshot_user_ids(session, broadcast.id, query)
+
+
+async def clear_snapshot(session, broadcast_id: int) -> None:
+    await session.execute(
+        delete(BroadcastRecipient).where(BroadcastRecipient.broadcast_id == broadcast_id)
+    )
+
+
+def _user_fetcher(session, query: Select, broadcast_id: int):
+    # Rows end with the snapshot position, which iter_user_pages pages by.
+    keyed = (
+        query.join(
+            BroadcastRecipient,
+            and_(
+                BroadcastRecipient.broadcast_id == broadcast_id,
+                BroadcastRecipient.tg_id == User.tg_id,
+            ),
+        )
+        .add_columns(BroadcastRecipient.position)
+        .order_by(BroadcastRecipient.position)
+    )
+
+    async def fetch_page(after: int | None, limit: int) -> Sequence[Any]:
+        page_query = keyed.limit(limit)
+        if after is not None:
+            page_query = page_query.where(BroadcastRecipient.position > after)
+        return (await session.execute(page_query)).all()
+
+    return fetch_page
+
+
+def iter_user_pages(
+    session, query: Select, broadcast_id: int, *, page_size: int | None = None
+) -> AsyncIterator[Sequence[Any]]:
+    return iter_keyset_pages(
+        _user_fetcher(session, query, broadcast_id),
+        page_size or settings.broadcast_page_size,
+        key=lambda row: row[-1],
+    )
+
+
+async def iter_user_ids(
+    session, query: Select, broadcast_id: int, *, page_size: int | None = None
+) -> AsyncIterator[int]:
+    async for page in iter_user_pages(session, query, broadcast_id, page_size=page_size):
+        for row in page:
+            yield row[0]
+
+
+async def check_members(
+    bot: Bot, chat_ref: str | int, tg_ids: Sequence[int], limiter: TokenBucket
+) -> AsyncIterator[tuple[int, ChatMember | None]]:
+    # Yields answers as they arrive; None means the check itself failed.
+    semaphore = asyncio.Semaphore(settings.subscription_check_concurrency)
+
+    async def check(tg_id: int) -> tuple[int, ChatMember | None]:
+        async with semaphore:
+            await limiter.acquire()
+            try:
+                return tg_id, await bot.get_chat_member(chat_ref, tg_id)
+            except Exception:
+                return tg_id, None
+
+    tasks = [asyncio.create_task(check(tg_id)) for tg_id in tg_ids]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def iter_channel_members(
+    session, bot: Bot, query: Select, broadcast_id: int
+) -> AsyncIterator[int]:
+    # channel_members answers for everyone the bot has seen in the channel. Only
+    # unknown users cost an API call (skipped if verified within the window); those
+    # are checked concurrently, streamed out as answers arrive and remembered.
+    chat_id = await resolve_chat_id(bot, settings.public_channel)
+    cutoff = utcnow() - timedelta(hours=settings.subscription_verify_ttl_hours)
+    fresh = func.coalesce(User.subscribed_verified_at >= cutoff, False)
+    rows = query.outerjoin(
+        ChannelMember,
+        and_(ChannelMember.chat_id == chat_id, ChannelMember.tg_id == User.tg_id),
+    ).add_columns(ChannelMember.is_member, fresh)
+    limiter = TokenBucket(settings.subscription_check_rate)
+    async for page in iter_user_pages(session, rows, broadcast_id):
+        to_check = []
+        for tg_id, is_member, is_fresh, *_ in page:
+            if is_member or (is_member is None and is_fresh):
+                yield tg_id
+            elif is_member is None:
+                to_check.append(tg_id)
+        checked = []
+        verified = []
+        async for tg_id, member in check_members(bot, chat_id, to_check, limiter):
+            if member is None:
+                continue
+            subscribed = is_subscribed(member)
+            checked.append((tg_id, member.status, subscribed))
+            if subscribed:
+                verified.append(tg_id)
+                yield tg_id
+        await record_channel_members(session, chat_id=chat_id, members=checked)
+        await mark_subscribed_verified_many(session, tg_ids=verified)
+
+
+def deliverable():
+    # Blocked users and chats that failed the last few broadcasts in a row are
+    # not worth a request until the user writes to the bot again.
+    return and_(
+        User.is_blocked.is_(False),
+        User.delivery_fail_streak < settings.undeliverable_after_failures,
+    )
+
+
+async def _segment_query(session, broadcast: Broadcast) -> Select | None:
+    query = select(User.tg_id).where(deliverable())
+    if broadcast.segment == BroadcastSegment.all_bot_users:
+        return query
+    if broadcast.segment == BroadcastSegment.subscribed_verified:
+        return query if settings.public_channel else None
+    giveaway = await get_active_giveaway(session)
+    if not giveaway:
+        return None
+    return query.join(Entry, Entry.tg_id == User.tg_id).where(
+        Entry.giveaway_id == giveaway.id,
+        Entry.status == EntryStatus.approved,
+    )
+
+
+async def count_user_ids(session, query: Select | None) -> int:
+    if query is None:
+        return 0
+    return (await session.execute(select(func.count()).select_from(query.subquery()))).scalar_one()
+
+
+async def count_recipients(session, broadcast: Broadcast) -> int:
+    # For subscribed_verified this is an upper bound: membership is resolved while sending.
+    return await count_user_ids(session, await _segment_query(session, broadcast))
+
+
+async def iter_recipients(
+    session,
+    bot: Bot,
+    broadcast: Broadcast,
+    *,
+    resume: bool = False,
+    tg_range: tuple[int, int] | None = None,
+) -> AsyncIterator[int]:
+    query = await _segment_query(session, broadcast)
+    if query is None:
+        return
+    if resume:
+        query = query.where(undelivered(broadcast.id))
+    if tg_range:
+        query = query.where(User.tg_id.between(*tg_range))
+
+    if broadcast.segment != BroadcastSegment.subscribed_verified:
+        async for tg_id in iter_user_ids(session, query, broadcast.id):
+            yield tg_id
+        return
+
+    async for tg_id in iter_channel_members(session, bot, query, broadcast.id):
+        yield tg_id
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from aiogram import Bot
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from backend.app.core.config import settings
+from backend.app.core.telegram import Lane, create_bot, set_lane
+
+T = TypeVar("T")
+
+# One event loop per worker process, running in its own thread, with the pooled
+# engine, Redis client and Bot HTTP sessions bound to it. Pool threads (or the
+# prefork child) hand their coroutines to it, so one process can run a long
+# broadcast next to rollover checks and announcements.
+_loop: asyncio.AbstractEventLoop | None = None
+_thread: threading.Thread | None = None
+_limit: asyncio.Semaphore | None = None
+_engine: AsyncEngine | None = None
+_sessions: async_sessionmaker[AsyncSession] | None = None
+_redis: Redis | None = None
+_bots: dict[str, Bot] = {}
+_lock = threading.Lock()
+
+
+def start() -> None:
+    global _loop, _thread, _limit, _engine, _sessions
+    with _lock:
+        if _loop is not None:
+            return
+        concurrency = max(settings.worker_async_concurrency, 1)
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="worker-loop", daemon=True)
+        thread.start()
+        _limit = asyncio.Semaphore(concurrency)
+        _engine = create_async_engine(
+            settings.database_url, pool_pre_ping=True, pool_size=concurrency
+        )
+        _sessions = async_sessionmaker(_engine, expire_on_commit=False, class_=AsyncSession)
+        _loop, _thread = loop, thread
+
+
+async def _limited(coro: Coroutine[Any, Any, T]) -> T:
+    # Worker sends are notifications unless a broadcast marks its own as bulk.
+    set_lane(Lane.transactional)
+    async with _limit:
+        return await coro
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    start()
+    return asyncio.run_coroutine_threadsafe(_limited(coro), _loop).result()
+
+
+def session() -> AsyncSession:
+    return _sessions()
+
+
+def redis() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(settings.redis_url)
+    return _redis
+
+
+def bot(token: str) -> Bot:
+    if token not in _bots:
+        _bots[token] = create_bot(token)
+    return _bots[token]
+
+
+async def _close() -> None:
+    global _redis
+    for client in _bots.values():
+        await client.session.close()
+    _bots.clear()
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+    await _engine.dispose()
+
+
+def shutdown() -> None:
+    global _loop, _thread, _limit, _engine, _sessions
+    with _lock:
+        if _loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(_close(), _loop).result()
+            asyncio.run_coroutine_threadsafe(_loop.shutdown_asyncgens(), _loop).result()
+        finally:
+            _loop.call_soon_threadsafe(_loop.stop)
+            _thread.join()
+            _loop.close()
+            _loop = _thread = _limit = _engine = _sessions = None
+
+
+@worker_process_init.connect
+def _on_process_init(**_) -> None:
+    start()
+
+
+# Prefork children get worker_process_shutdown; solo/threads pools only the latter.
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _on_shutdown(**_) -> None:
+    shutdown()
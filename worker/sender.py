@@ -0,0 +1,343 @@
+import asyncio
+import heapq
+import random
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import dataclass
+
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from backend.app.core.telegram import RedisTokenBucket
+from backend.app.models.enums import DeliveryStatus
+
+DeliveryResult = tuple[int, DeliveryStatus, str | None]
+
+# Worth another attempt later. Anything else (bad request, chat not found, user
+# deactivated, ...) will fail the same way again and is recorded as failed.
+TRANSIENT_ERRORS = (
+    TelegramRetryAfter,
+    TelegramServerError,
+    TelegramNetworkError,
+    TimeoutError,
+    ConnectionError,
+    # The shared rate bucket lives in Redis.
+    RedisConnectionError,
+    RedisTimeoutError,
+)
+
+# Bad requests that are about the recipient, not the message. Together with
+# Forbidden (blocked, deactivated) only these make a user undeliverable.
+_RECIPIENT_BAD_REQUESTS = ("chat not found", "user is deactivated", "peer_id_invalid")
+
+
+def error_label(exc: Exception) -> str:
+    if isinstance(exc, TelegramBadRequest):
+        message = exc.message.lower()
+        for reason in _RECIPIENT_BAD_REQUESTS:
+            if reason in message:
+                return f"{type(exc).__name__}: {reason}"
+    return type(exc).__name__
+
+
+def is_recipient_error(label: str | None) -> bool:
+    if label is None:
+        return False
+    return label == TelegramForbiddenError.__name__ or label.startswith(
+        f"{TelegramBadRequest.__name__}: "
+    )
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = max(rate, 0.1)
+        self.capacity = capacity if capacity is not None else max(self.rate, 1.0)
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    self._updated = time.monotonic()
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AimdController:
+    # Additive increase while sends succeed, multiplicative decrease on throttling,
+    # so the bucket settles near the highest rate Telegram currently accepts.
+    def __init__(
+        self,
+        bucket: TokenBucket | RedisTokenBucket,
+        *,
+        floor: float,
+        ceiling: float,
+        step: float = 1.0,
+        backoff: float = 0.5,
+        cooldown: float = 1.0,
+    ) -> None:
+        self.bucket = bucket
+        self.floor = max(floor, 0.1)
+        self.ceiling = max(ceiling, self.floor)
+        self.step = step
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self._successes = 0
+        self._last_decrease = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    def on_success(self) -> None:
+        self._successes += 1
+        # Roughly one step per second of clean sending at the current rate.
+        if self._successes >= self.bucket.rate:
+            self._successes = 0
+            self.bucket.rate = min(self.ceiling, self.bucket.rate + self.step)
+
+    def on_congestion(self) -> None:
+        now = time.monotonic()
+        # Sends already in flight at the old rate fail together; cut once per burst.
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._successes = 0
+        self.bucket.rate = max(self.floor, self.bucket.rate * self.backoff)
+
+
+@dataclass
+class SendStats:
+    sent_ok: int = 0
+    sent_fail: int = 0
+    blocked: int = 0
+    requeued: int = 0
+    # Included in sent_fail: transient errors that outlasted every retry.
+    gave_up: int = 0
+    # The circuit breaker stopped the run after too many early failures.
+    tripped: bool = False
+
+
+class BroadcastSender:
+    def __init__(
+        self,
+        *,
+        rate: float,
+        concurrency: int,
+        max_rate: float | None = None,
+        min_rate: float = 1.0,
+        max_requeue: int = 5,
+        retry_base: float = 1.0,
+        retry_cap: float = 60.0,
+        breaker_window: int = 0,
+        breaker_threshold: float = 1.0,
+        check_every: int = 10,
+        flush_every: int = 200,
+        flush_interval: float = 5.0,
+        bucket: TokenBucket | RedisTokenBucket | None = None,
+    ) -> None:
+        self.bucket = bucket or TokenBucket(rate)
+        self.controller = AimdController(
+            self.bucket, floor=min(min_rate, rate), ceiling=max_rate or rate
+        )
+        self.concurrency = max(concurrency, 1)
+        self.max_requeue = max_requeue
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self.breaker_window = breaker_window
+        self.breaker_threshold = breaker_threshold
+        self.check_every = max(check_every, 1)
+        self.flush_every = max(flush_every, 1)
+        self.flush_interval = flush_interval
+        # Stats of the current run, readable from the on_results callback.
+        self.stats = SendStats()
+
+    async def run(
+        self,
+        recipients: AsyncIterable[int] | Iterable[int],
+        send: Callable[[int], Awaitable[None]],
+        *,
+        should_stop: Callable[[], Awaitable[bool]] | None = None,
+        on_results: Callable[[list[DeliveryResult]], Awaitable[None]] | None = None,
+        throttle: Callable[[], Awaitable[bool]] | None = None,
+    ) -> SendStats:
+        stats = self.stats = SendStats()
+        pending: list[DeliveryResult] = []
+        last_flush = time.monotonic()
+        queue: asyncio.Queue[int] = asyncio.Queue(maxsize=self.concurrency * 2)
+        # (ready at, tg_id) for transient failures waiting out their backoff.
+        delayed: list[tuple[float, int]] = []
+        attempts: dict[int, int] = {}
+        early_total = early_failed = 0
+
+        def observe(failed: bool) -> None:
+            # A payload Telegram rejects fails for everyone; judge the first
+            # breaker_window outcomes instead of walking the whole list.
+            nonlocal early_total, early_failed
+            if early_total >= self.breaker_window:
+                return
+            early_total += 1
+            early_failed += failed
+            if (
+                early_total == self.breaker_window
+                and early_failed / early_total > self.breaker_threshold
+            ):
+                stats.tripped = True
+
+        def retry_later(tg_id: int, exc: Exception) -> None:
+            count = attempts.get(tg_id, 0) + 1
+            if count <= self.max_requeue:
+                attempts[tg_id] = count
+                stats.requeued += 1
+                # Capped exponential backoff with equal jitter, so recipients that
+                # failed together do not come back together.
+                delay = min(self.retry_cap, self.retry_base * 2 ** (count - 1))
+                delay = delay / 2 + random.uniform(0, delay / 2)
+                heapq.heappush(delayed, (time.monotonic() + delay, tg_id))
+                return
+            attempts.pop(tg_id, None)
+            stats.sent_fail += 1
+            stats.gave_up += 1
+            pending.append((tg_id, DeliveryStatus.gave_up, type(exc).__name__))
+            observe(True)
+
+        async def send_one(tg_id: int) -> None:
+            # acquire() talks to Redis too; an error there must end up as a result,
+            # or the worker dies and queue.join() never returns.
+            try:
+                await self.bucket.acquire()
+                await send(tg_id)
+            except TelegramForbiddenError as exc:
+                attempts.pop(tg_id, None)
+                stats.sent_fail += 1
+                stats.blocked += 1
+                pending.append((tg_id, DeliveryStatus.blocked, error_label(exc)))
+                observe(False)
+            except TRANSIENT_ERRORS as exc:
+                if isinstance(exc, TelegramRetryAfter):
+                    self.bucket.pause(exc.retry_after)
+                if isinstance(exc, (TelegramRetryAfter, TelegramServerError)):
+                    self.controller.on_congestion()
+                retry_later(tg_id, exc)
+            except Exception as exc:
+                attempts.pop(tg_id, None)
+                stats.sent_fail += 1
+                label = error_label(exc)
+                pending.append((tg_id, DeliveryStatus.failed, label))
+                # A dead chat says nothing about the payload.
+                observe(not is_recipient_error(label))
+            else:
+                attempts.pop(tg_id, None)
+                stats.sent_ok += 1
+                pending.append((tg_id, DeliveryStatus.sent, None))
+                self.controller.on_success()
+                observe(False)
+
+        async def worker() -> None:
+            while True:
+                tg_id = await queue.get()
+                try:
+                    await send_one(tg_id)
+                finally:
+                    queue.task_done()
+
+        async def flush(force: bool = False) -> None:
+            nonlocal last_flush
+            if on_results is None or not pending:
+                return
+            # Hold the first results back until the breaker has judged them, so a
+            # tripped run never reports outcomes it would have disowned.
+            if not force and not stats.tripped and early_total < self.breaker_window:
+                return
+            due = time.monotonic() - last_flush >= self.flush_interval
+            if not force and not due and len(pending) < self.flush_every:
+                return
+            last_flush = time.monotonic()
+            batch = pending[:]
+            del pending[: len(batch)]
+            await on_results(batch)
+
+        async def checkpoint() -> bool:
+            await flush()
+            if stats.tripped:
+                return True
+            # Outside pressure (e.g. a busy bot) backs off like Telegram throttling.
+            if throttle is not None and await throttle():
+                self.controller.on_congestion()
+            return should_stop is not None and await should_stop()
+
+        async def release_due() -> None:
+            now = time.monotonic()
+            while delayed and delayed[0][0] <= now:
+                await queue.put(heapq.heappop(delayed)[1])
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        # Only this feeding loop awaits should_stop, on_results and throttle, so callers may use
+        # their DB session there without racing the send workers.
+        try:
+            stopped = False
+            idx = 0
+            async for tg_id in _aiter(recipients):
+                idx += 1
+                if idx % self.check_every == 0 and await checkpoint():
+                    stopped = True
+                    break
+                await release_due()
+                await queue.put(tg_id)
+            # Delayed retries keep coming back until none are left waiting.
+            while True:
+                if stopped:
+                    _drain(queue)
+                    delayed.clear()
+                await queue.join()
+                if stopped or not delayed:
+                    break
+                wait = delayed[0][0] - time.monotonic()
+                if wait > 0:
+                    # Sleep in slices so results are flushed and cancellation seen.
+                    await asyncio.sleep(min(wait, self.flush_interval))
+                if await checkpoint():
+                    stopped = True
+                    continue
+                await release_due()
+            await flush(force=True)
+        finally:
+            for task in workers:
+                task.cancel()
+        return stats
+
+
+async def _aiter(recipients: AsyncIterable[int] | Iterable[int]) -> AsyncIterator[int]:
+    if isinstance(recipients, AsyncIterable):
+        async for tg_id in recipients:
+            yield tg_id
+    else:
+        for tg_id in recipients:
+            yield tg_id
+
+
+def _drain(queue: asyncio.Queue) -> None:
+    while not queue.empty():
+        queue.get_nowait()
+        queue.task_done()
@@ -1,19 +1,19 @@
-import asyncio
+import logging
+import os
 import random
 from calendar import monthrange
-from contextlib import asynccontextmanager
+from collections.abc import AsyncIterable, Awaitable, Callable
 from datetime import datetime, timedelta, timezone
 
 from aiogram import Bot
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums import ChatMemberStatus
-from aiogram.enums import ParseMode
-from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile
+from celery import chord
+from sqlalchemy import func, select
 
+from backend.app.core.bot_load import LoadPacer
 from backend.app.core.config import settings
+from backend.app.core.telegram import Lane, RedisTokenBucket, send_lane
 from backend.app.core.time import utcnow
 from backend.app.models.broadcast import Broadcast
 from backend.app.models.admin_user import AdminUser
@@ -22,252 +22,477 @@ from backend.app.models.giveaway import Giveaway
 from backend.app.models.enums import (
     BroadcastPayloadType,
     BroadcastSegment,
+    DeliveryStatus,
     EntryStatus,
-    GiveawayStatus,
 )
 from backend.app.models.user import User
 from backend.app.services.automation_service import (
+    claim_automation_fence,
     get_automation_settings,
+    issue_automation_fence,
     mark_run_month,
     should_run_for_month,
 )
 from backend.app.services.audit_service import log_action
+from backend.app.services.broadcast_service import record_progress
+from backend.app.services.broadcast_signals import CancelWatcher, publish_cancel
+from backend.app.services.delivery_service import count_deliveries, record_deliveries
 from backend.app.services.giveaway_service import (
     close_giveaway,
     create_giveaway,
     get_active_giveaway,
 )
 from backend.app.services.winner_service import create_winner
-from backend.app.services.user_service import mark_blocked, mark_subscribed_verified
+from backend.app.services.user_service import mark_blocked_many, record_delivery_outcomes
+from worker import runtime
 from worker.celery_app import celery_app
+from worker.lease import LeaderLease
+from worker.recipients import (
+    clear_snapshot,
+    count_recipients,
+    count_user_ids,
+    deliverable,
+    iter_recipients,
+    iter_user_ids,
+    snapshot_recipients,
+    snapshot_user_ids,
+)
+from worker.sender import BroadcastSender, DeliveryResult, is_recipient_error
+
+logger = logging.getLogger(__name__)
 
+# Shared by every broadcast task, so parallel shards stay within one global rate.
+BROADCAST_RATE_KEY = "broadcast:rate"
+# ISO run time of the rollover check currently waiting in the queue.
+AUTOMATION_ETA_KEY = "automation:eta"
 
-@asynccontextmanager
-async def worker_session():
-    engine = create_async_engine(settings.database_url, poolclass=NullPool)
-    Session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
-    async with Session() as session:
-        yield session
-    await engine.dispose()
+# KEYS[1] ETA key; ARGV[1] token. Deletes the key only while it still holds the token.
+_RELEASE_ETA_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
 
 
 async def _send_payload(bot: Bot, tg_id: int, broadcast: Broadcast) -> None:
+    file_id = broadcast.staged_file_id or broadcast.payload_file_id
     if broadcast.payload_type == BroadcastPayloadType.text:
         await bot.send_message(tg_id, broadcast.text or "")
     elif broadcast.payload_type == BroadcastPayloadType.photo:
-        await bot.send_photo(tg_id, broadcast.payload_file_id, caption=broadcast.text)
+        await bot.send_photo(tg_id, file_id, caption=broadcast.text)
     elif broadcast.payload_type == BroadcastPayloadType.video:
-        await bot.send_video(tg_id, broadcast.payload_file_id, caption=broadcast.text)
+        await bot.send_video(tg_id, file_id, caption=broadcast.text)
     elif broadcast.payload_type == BroadcastPayloadType.document:
-        await bot.send_document(tg_id, broadcast.payload_file_id, caption=broadcast.text)
+        await bot.send_document(tg_id, file_id, caption=broadcast.text)
     elif broadcast.payload_type == BroadcastPayloadType.video_note:
-        await bot.send_video_note(tg_id, broadcast.payload_file_id)
-
-
-def _is_channel_member(status: ChatMemberStatus | str) -> bool:
-    return status in {
-        ChatMemberStatus.MEMBER,
-        ChatMemberStatus.ADMINISTRATOR,
-        ChatMemberStatus.OWNER,
-    }
-
-
-async def _collect_recipients(session, bot: Bot, broadcast: Broadcast) -> list[int]:
-    if broadcast.segment == BroadcastSegment.all_bot_users:
-        rows = (
-            await session.execute(select(User.tg_id).where(User.is_blocked.is_(False)))
-        ).all()
-        return [row[0] for row in rows]
-    if broadcast.segment == BroadcastSegment.subscribed_verified:
-        if not settings.public_channel:
-            return []
-        rows = (
-            await session.execute(select(User.tg_id).where(User.is_blocked.is_(False)))
-        ).all()
-        recipients: list[int] = []
-        for row in rows:
-            tg_id = row[0]
-            try:
-                member = await bot.get_chat_member(settings.public_channel, tg_id)
-            except Exception:
-                continue
-            if _is_channel_member(member.status):
-                recipients.append(tg_id)
-                await mark_subscribed_verified(session, tg_id=tg_id)
+        await bot.send_video_note(tg_id, file_id)
+
+
+def _sink_chat_id(broadcast: Broadcast) -> int:
+    return settings.broadcast_preflight_chat_id or broadcast.created_by
+
+
+async def _stage_media(broadcast: Broadcast) -> None:
+    # payload_file_id was received by the admin bot, and file_ids are per bot.
+    # Download it once and upload it once through the user bot, so every send is
+    # a plain file_id reference.
+    if (
+        broadcast.payload_type == BroadcastPayloadType.text
+        or not broadcast.payload_file_id
+        or broadcast.staged_file_id
+        or settings.admin_bot_token == settings.user_bot_token
+        or not _sink_chat_id(broadcast)
+    ):
+        return
+    admin_bot = runtime.bot(settings.admin_bot_token)
+    user_bot = runtime.bot(settings.user_bot_token)
+    chat_id = _sink_chat_id(broadcast)
+    try:
+        file = await admin_bot.get_file(broadcast.payload_file_id)
+        data = await admin_bot.download_file(file.file_path)
+        upload = BufferedInputFile(data.read(), filename=os.path.basename(file.file_path))
+        if broadcast.payload_type == BroadcastPayloadType.photo:
+            message = await user_bot.send_photo(chat_id, upload, disable_notification=True)
+            staged = message.photo[-1].file_id
+        elif broadcast.payload_type == BroadcastPayloadType.video:
+            message = await user_bot.send_video(chat_id, upload, disable_notification=True)
+            staged = message.video.file_id
+        elif broadcast.payload_type == BroadcastPayloadType.document:
+            message = await user_bot.send_document(chat_id, upload, disable_notification=True)
+            staged = message.document.file_id
+        else:
+            message = await user_bot.send_video_note(chat_id, upload, disable_notification=True)
+            staged = message.video_note.file_id
+    except Exception:
+        # Too large for the Bot API download (20 MB) or the sink is unreachable;
+        # the preflight tells whether the original file_id works for the user bot.
+        return
+    broadcast.staged_file_id = staged
+    try:
+        await user_bot.delete_message(chat_id, message.message_id)
+    except Exception:
+        pass
+
+
+async def _preflight(bot: Bot, broadcast: Broadcast) -> str | None:
+    # One real send to the sink chat (or the creating admin) catches payloads that
+    # would fail for every recipient: broken HTML, another bot's file_id.
+    chat_id = _sink_chat_id(broadcast)
+    if not chat_id:
+        return None
+    try:
+        await _send_payload(bot, chat_id, broadcast)
+    except TelegramBadRequest as exc:
+        if "chat not found" in exc.message.lower():
+            return None
+        return exc.message
+    except Exception:
+        # The target itself is unreachable; the circuit breaker still guards the run.
+        return None
+    return None
+
+
+async def _abort(session, broadcast: Broadcast, error: str) -> None:
+    broadcast.error = error
+    if broadcast.sent_at is None:
+        broadcast.sent_at = utcnow()
+    await session.commit()
+    if broadcast.created_by:
+        try:
+            await runtime.bot(settings.admin_bot_token).send_message(
+                broadcast.created_by,
+                f"Рассылка #{broadcast.id} остановлена: {error}",
+                parse_mode=None,
+            )
+        except Exception:
+            pass
+
+
+async def _deliver(
+    session,
+    broadcast: Broadcast,
+    recipients: AsyncIterable[int],
+    send: Callable[[int], Awaitable[None]],
+    *,
+    total: int | None = None,
+    finalize: bool = True,
+    paced: bool = False,
+) -> None:
+    async def checkpoint(results) -> None:
+        sent_ok, sent_fail = await record_deliveries(
+            session, broadcast_id=broadcast.id, results=results
+        )
+        await mark_blocked_many(
+            session,
+            tg_ids=[tg_id for tg_id, status, _ in results if status == DeliveryStatus.blocked],
+        )
+        if not sender.stats.tripped:
+            # A tripped run failed because of its payload, not its recipients.
+            delivered, failures = delivery_outcomes(results)
+            await record_delivery_outcomes(session, delivered=delivered, failures=failures)
+        await record_progress(
+            session,
+            broadcast_id=broadcast.id,
+            sent_ok=sent_ok,
+            sent_fail=sent_fail,
+            send_rate=sender.controller.rate,
+        )
         await session.commit()
-        return recipients
 
-    giveaway = (
-        await session.execute(
-            select(Giveaway).where(Giveaway.status == GiveawayStatus.active)
+    if total is not None and broadcast.recipients_total is None:
+        broadcast.recipients_total = total
+    await session.commit()
+    redis = runtime.redis()
+    async with CancelWatcher(redis, broadcast.id) as watcher:
+
+        async def is_cancelled() -> bool:
+            return watcher.cancelled
+
+        rate = max(settings.broadcast_rate_per_sec, 1)
+        # Paced broadcasts (announcements everyone reacts to) also back off while
+        # the user bot is struggling with the resulting taps.
+        pacer = LoadPacer(redis) if paced else None
+        sender = BroadcastSender(
+            rate=rate,
+            max_rate=settings.broadcast_max_rate_per_sec,
+            min_rate=settings.announce_pace_min_rate if paced else 1.0,
+            concurrency=settings.broadcast_concurrency,
+            # Cancellation is pushed over Redis, so checking it per recipient is free.
+            check_every=1,
+            flush_every=settings.broadcast_flush_size,
+            flush_interval=settings.broadcast_flush_seconds,
+            max_requeue=settings.broadcast_max_retries,
+            retry_base=settings.broadcast_retry_base_seconds,
+            retry_cap=settings.broadcast_retry_max_seconds,
+            breaker_window=settings.broadcast_breaker_window,
+            breaker_threshold=settings.broadcast_breaker_threshold,
+            bucket=RedisTokenBucket(redis, BROADCAST_RATE_KEY, rate),
+        )
+        with send_lane(Lane.bulk):
+            stats = await sender.run(
+                recipients,
+                send,
+                should_stop=is_cancelled,
+                on_results=checkpoint,
+                throttle=pacer.overloaded if pacer else None,
+            )
+    if finalize or stats.tripped:
+        await session.refresh(broadcast)
+        await _finalize(session, broadcast)
+    await session.commit()
+    if stats.tripped:
+        # Sibling shards stop through the same channel as a manual cancel.
+        await publish_cancel(broadcast.id)
+        await _abort(
+            session,
+            broadcast,
+            f"больше {settings.broadcast_breaker_threshold:.0%} ошибок среди первых "
+            f"{settings.broadcast_breaker_window} отправок",
         )
-    ).scalar_one_or_none()
-    if not giveaway:
-        return []
 
+
+def delivery_outcomes(
+    results: list[DeliveryResult],
+) -> tuple[list[int], list[tuple[int, str | None]]]:
+    # Only errors about the recipient count towards its fail streak; a rejected
+    # payload or a struggling Telegram (gave_up) says nothing about the chat.
+    delivered = [tg_id for tg_id, status, _ in results if status == DeliveryStatus.sent]
+    failures = [
+        (tg_id, error)
+        for tg_id, status, error in results
+        if status in (DeliveryStatus.failed, DeliveryStatus.blocked)
+        and is_recipient_error(error)
+    ]
+    return delivered, failures
+
+
+async def _finalize(session, broadcast: Broadcast) -> None:
+    # Totals come from the ledger so that resumed and sharded runs report the
+    # whole broadcast.
+    counts = await count_deliveries(session, broadcast_id=broadcast.id)
+    if broadcast.sent_at is None:
+        broadcast.sent_at = utcnow()
+    broadcast.sent_ok = counts[DeliveryStatus.sent]
+    broadcast.sent_fail = (
+        counts[DeliveryStatus.failed]
+        + counts[DeliveryStatus.blocked]
+        + counts[DeliveryStatus.gave_up]
+    )
+    broadcast.sent_gave_up = counts[DeliveryStatus.gave_up]
+    await clear_snapshot(session, broadcast.id)
+
+
+async def _shard_ranges(session, shards: int) -> list[tuple[int, int]]:
+    ranked = (
+        select(
+            User.tg_id,
+            func.ntile(shards).over(order_by=User.tg_id).label("shard"),
+        )
+        .where(deliverable())
+        .subquery()
+    )
     rows = (
         await session.execute(
-            select(User.tg_id)
-            .join(Entry, Entry.tg_id == User.tg_id)
-            .where(
-                Entry.giveaway_id == giveaway.id,
-                Entry.status == EntryStatus.approved,
-                User.is_blocked.is_(False),
-            )
+            select(func.min(ranked.c.tg_id), func.max(ranked.c.tg_id))
+            .group_by(ranked.c.shard)
+            .order_by(ranked.c.shard)
         )
     ).all()
-    return [row[0] for row in rows]
+    return [(row[0], row[1]) for row in rows]
 
 
 @celery_app.task(name="worker.tasks.send_broadcast")
-def send_broadcast(broadcast_id: int) -> None:
-    asyncio.run(_send_broadcast_async(broadcast_id))
-
-
-async def _send_broadcast_async(broadcast_id: int) -> None:
-    async with Bot(
-        token=settings.user_bot_token,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-    ) as bot:
-        async with worker_session() as session:
-            broadcast = await session.get(Broadcast, broadcast_id)
-            if not broadcast:
+def send_broadcast(broadcast_id: int, resume: bool = False) -> None:
+    runtime.run(_send_broadcast_async(broadcast_id, resume=resume))
+
+
+async def _send_broadcast_async(broadcast_id: int, *, resume: bool = False) -> None:
+    bot = runtime.bot(settings.user_bot_token)
+    async with runtime.session() as session:
+        broadcast = await session.get(Broadcast, broadcast_id)
+        if not broadcast or broadcast.sent_at is not None:
+            return
+        if broadcast.started_at is None:
+            await _stage_media(broadcast)
+            error = await _preflight(bot, broadcast)
+            if error:
+                await _abort(session, broadcast, f"проверочная отправка не прошла: {error}")
                 return
-            if broadcast.started_at is None:
-                broadcast.started_at = utcnow()
-                await session.commit()
-            recipients = await _collect_recipients(session, bot, broadcast)
-            sent_ok = 0
-            sent_fail = 0
-            rate = max(settings.broadcast_rate_per_sec, 1)
-            delay = 1 / rate
-
-            for idx, tg_id in enumerate(recipients, start=1):
-                if idx % 10 == 0:
-                    await session.refresh(broadcast)
-                if broadcast.is_cancelled:
-                    break
-                try:
-                    await _send_payload(bot, tg_id, broadcast)
-                    sent_ok += 1
-                except TelegramForbiddenError:
-                    sent_fail += 1
-                    await mark_blocked(session, tg_id=tg_id)
-                except TelegramRetryAfter as exc:
-                    await asyncio.sleep(exc.retry_after)
-                except Exception:
-                    sent_fail += 1
-                await asyncio.sleep(delay)
-
-            broadcast.sent_at = utcnow()
-            broadcast.sent_ok = sent_ok
-            broadcast.sent_fail = sent_fail
-            await session.commit()
+            broadcast.started_at = utcnow()
+        else:
+            # A redelivered task (worker lost mid-run) continues from the ledger.
+            resume = True
+        await snapshot_recipients(session, broadcast)
+        await session.commit()
+        recipients = iter_recipients(session, bot, broadcast, resume=resume)
+        await _deliver(
+            session,
+            broadcast,
+            recipients,
+            lambda tg_id: _send_payload(bot, tg_id, broadcast),
+            total=await count_recipients(session, broadcast),
+        )
 
 
-@celery_app.task(name="worker.tasks.send_broadcast_text")
-def send_broadcast_text(text: str) -> None:
-    asyncio.run(_send_broadcast_text_async(text))
-
-
-async def _send_broadcast_text_async(text: str) -> None:
-    async with Bot(
-        token=settings.user_bot_token,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-    ) as bot:
-        async with worker_session() as session:
-            broadcast = Broadcast(
-                created_by=0,
-                segment=BroadcastSegment.all_bot_users,
-                payload_type=BroadcastPayloadType.text,
-                text=text,
-                created_at=utcnow(),
-            )
-            session.add(broadcast)
-            await session.flush()
+@celery_app.task(name="worker.tasks.send_broadcast_sharded")
+def send_broadcast_sharded(broadcast_id: int, shards: int | None = None) -> None:
+    runtime.run(
+        _send_broadcast_sharded_async(broadcast_id, shards or settings.broadcast_shards)
+    )
+
+
+async def _send_broadcast_sharded_async(broadcast_id: int, shards: int) -> None:
+    async with runtime.session() as session:
+        broadcast = await session.get(Broadcast, broadcast_id)
+        if not broadcast or broadcast.sent_at is not None:
+            return
+        if broadcast.started_at is None:
+            await _stage_media(broadcast)
+            error = await _preflight(runtime.bot(settings.user_bot_token), broadcast)
+            if error:
+                await _abort(session, broadcast, f"проверочная отправка не прошла: {error}")
+                return
             broadcast.started_at = utcnow()
-            recipients = (
-                await session.execute(
-                    select(User.tg_id).where(User.is_blocked.is_(False))
-                )
-            ).all()
-            rate = max(settings.broadcast_rate_per_sec, 1)
-            delay = 1 / rate
-            sent_ok = 0
-            sent_fail = 0
-            for idx, row in enumerate(recipients, start=1):
-                tg_id = row[0]
-                if idx % 10 == 0:
-                    await session.refresh(broadcast)
-                if broadcast.is_cancelled:
-                    break
-                try:
-                    await bot.send_message(tg_id, text)
-                    sent_ok += 1
-                except TelegramForbiddenError:
-                    sent_fail += 1
-                    await mark_blocked(session, tg_id=tg_id)
-                except Exception:
-                    sent_fail += 1
-                    pass
-                await asyncio.sleep(delay)
-            broadcast.sent_at = utcnow()
-            broadcast.sent_ok = sent_ok
-            broadcast.sent_fail = sent_fail
+        if broadcast.recipients_total is None:
+            broadcast.recipients_total = await count_recipients(session, broadcast)
+        # Shards all page through the one order snapshot, each within its tg_id range.
+        await snapshot_recipients(session, broadcast)
+        ranges = await _shard_ranges(session, max(shards, 1))
+        if not ranges:
+            await _finalize(session, broadcast)
+        await session.commit()
+    if ranges:
+        chord(
+            send_broadcast_shard.si(broadcast_id, tg_id_from, tg_id_to)
+            for tg_id_from, tg_id_to in ranges
+        )(finalize_broadcast.si(broadcast_id))
+
+
+@celery_app.task(name="worker.tasks.send_broadcast_shard")
+def send_broadcast_shard(broadcast_id: int, tg_id_from: int, tg_id_to: int) -> None:
+    try:
+        runtime.run(_send_broadcast_shard_async(broadcast_id, tg_id_from, tg_id_to))
+    except Exception as exc:
+        # A raising header task would keep the chord from ever calling
+        # finalize_broadcast; record the error and let the broadcast complete.
+        logger.exception("Broadcast %s shard %s-%s failed", broadcast_id, tg_id_from, tg_id_to)
+        runtime.run(
+            _record_error(
+                broadcast_id,
+                f"часть получателей не обработана ({tg_id_from}–{tg_id_to}): "
+                f"{type(exc).__name__}",
+            )
+        )
+
+
+async def _record_error(broadcast_id: int, error: str) -> None:
+    async with runtime.session() as session:
+        broadcast = await session.get(Broadcast, broadcast_id)
+        if broadcast and broadcast.error is None:
+            broadcast.error = error
             await session.commit()
 
 
+async def _send_broadcast_shard_async(
+    broadcast_id: int, tg_id_from: int, tg_id_to: int
+) -> None:
+    bot = runtime.bot(settings.user_bot_token)
+    async with runtime.session() as session:
+        broadcast = await session.get(Broadcast, broadcast_id)
+        if not broadcast or broadcast.is_cancelled:
+            return
+        recipients = iter_recipients(
+            session,
+            bot,
+            broadcast,
+            resume=True,
+            tg_range=(tg_id_from, tg_id_to),
+        )
+        await _deliver(
+            session,
+            broadcast,
+            recipients,
+            lambda tg_id: _send_payload(bot, tg_id, broadcast),
+            finalize=False,
+        )
+
+
+@celery_app.task(name="worker.tasks.finalize_broadcast")
+def finalize_broadcast(broadcast_id: int) -> None:
+    runtime.run(_finalize_broadcast_async(broadcast_id))
+
+
+async def _finalize_broadcast_async(broadcast_id: int) -> None:
+    async with runtime.session() as session:
+        broadcast = await session.get(Broadcast, broadcast_id)
+        if not broadcast:
+            return
+        await _finalize(session, broadcast)
+        await session.commit()
+
+
+@celery_app.task(name="worker.tasks.send_broadcast_text")
+def send_broadcast_text(text: str, paced: bool = False) -> None:
+    runtime.run(_send_broadcast_text_async(text, paced=paced))
+
+
+async def _send_broadcast_text_async(text: str, *, paced: bool = False) -> None:
+    bot = runtime.bot(settings.user_bot_token)
+    async with runtime.session() as session:
+        broadcast = Broadcast(
+            created_by=0,
+            segment=BroadcastSegment.all_bot_users,
+            payload_type=BroadcastPayloadType.text,
+            text=text,
+            created_at=utcnow(),
+        )
+        session.add(broadcast)
+        await session.flush()
+        broadcast.started_at = utcnow()
+        query = select(User.tg_id).where(deliverable())
+        await snapshot_user_ids(session, broadcast.id, query)
+        await _deliver(
+            session,
+            broadcast,
+            iter_user_ids(session, query, broadcast.id),
+            lambda tg_id: bot.send_message(tg_id, text),
+            total=await count_user_ids(session, query),
+            paced=paced,
+        )
+
+
 @celery_app.task(name="worker.tasks.send_broadcast_text_exclude")
 def send_broadcast_text_exclude(text: str, exclude_tg_ids: list[int]) -> None:
-    asyncio.run(_send_broadcast_text_exclude_async(text, exclude_tg_ids))
+    runtime.run(_send_broadcast_text_exclude_async(text, exclude_tg_ids))
 
 
 async def _send_broadcast_text_exclude_async(
     text: str, exclude_tg_ids: list[int]
 ) -> None:
-    async with Bot(
-        token=settings.user_bot_token,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-    ) as bot:
-        async with worker_session() as session:
-            broadcast = Broadcast(
-                created_by=0,
-                segment=BroadcastSegment.all_bot_users,
-                payload_type=BroadcastPayloadType.text,
-                text=text,
-                created_at=utcnow(),
-            )
-            session.add(broadcast)
-            await session.flush()
-            broadcast.started_at = utcnow()
-            query = select(User.tg_id).where(User.is_blocked.is_(False))
-            if exclude_tg_ids:
-                query = query.where(User.tg_id.not_in(exclude_tg_ids))
-            recipients = (await session.execute(query)).all()
-            rate = max(settings.broadcast_rate_per_sec, 1)
-            delay = 1 / rate
-            sent_ok = 0
-            sent_fail = 0
-            for idx, row in enumerate(recipients, start=1):
-                tg_id = row[0]
-                if idx % 10 == 0:
-                    await session.refresh(broadcast)
-                if broadcast.is_cancelled:
-                    break
-                try:
-                    await bot.send_message(tg_id, text)
-                    sent_ok += 1
-                except TelegramForbiddenError:
-                    sent_fail += 1
-                    await mark_blocked(session, tg_id=tg_id)
-                except Exception:
-                    sent_fail += 1
-                    pass
-                await asyncio.sleep(delay)
-            broadcast.sent_at = utcnow()
-            broadcast.sent_ok = sent_ok
-            broadcast.sent_fail = sent_fail
-            await session.commit()
+    bot = runtime.bot(settings.user_bot_token)
+    async with runtime.session() as session:
+        broadcast = Broadcast(
+            created_by=0,
+            segment=BroadcastSegment.all_bot_users,
+            payload_type=BroadcastPayloadType.text,
+            text=text,
+            created_at=utcnow(),
+        )
+        session.add(broadcast)
+        await session.flush()
+        broadcast.started_at = utcnow()
+        query = select(User.tg_id).where(deliverable())
+        if exclude_tg_ids:
+            query = query.where(User.tg_id.not_in(exclude_tg_ids))
+        await snapshot_user_ids(session, broadcast.id, query)
+        await _deliver(
+            session,
+            broadcast,
+            iter_user_ids(session, query, broadcast.id),
+            lambda tg_id: bot.send_message(tg_id, text),
+            total=await count_user_ids(session, query),
+        )
 
 
 def _format_title(template: str, now: datetime) -> str:
@@ -375,27 +600,24 @@ async def _announce_start(giveaway: Giveaway) -> None:
         f"Название: {giveaway.title}"
     )
     if settings.public_channel:
-        async with Bot(
-            token=settings.user_bot_token,
-            default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-        ) as user_bot:
+        user_bot = runtime.bot(settings.user_bot_token)
+        try:
+            await user_bot.send_message(settings.public_channel, channel_text)
+        except Exception:
+            pass
+    # Everyone taps "Розыгрыш" right after this one; pace it by the user bot's load.
+    celery_app.send_task(
+        "worker.tasks.send_broadcast_text", args=[bot_text], kwargs={"paced": True}
+    )
+    async with runtime.session() as session:
+        admin_ids = await _fetch_admin_tg_ids(session)
+    if admin_ids:
+        admin_bot = runtime.bot(settings.admin_bot_token)
+        for admin_id in admin_ids:
             try:
-                await user_bot.send_message(settings.public_channel, channel_text)
+                await admin_bot.send_message(admin_id, admin_text)
             except Exception:
                 pass
-    celery_app.send_task("worker.tasks.send_broadcast_text", args=[bot_text])
-    async with worker_session() as session:
-        admin_ids = await _fetch_admin_tg_ids(session)
-    if admin_ids:
-        async with Bot(
-            token=settings.admin_bot_token,
-            default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-        ) as admin_bot:
-            for admin_id in admin_ids:
-                try:
-                    await admin_bot.send_message(admin_id, admin_text)
-                except Exception:
-                    pass
 
 
 async def _draw_and_notify(active: Giveaway, session) -> dict:
@@ -429,39 +651,105 @@ async def _draw_and_notify(active: Giveaway, session) -> dict:
         if winner_username
         else "🎉 Розыгрыш завершен! Новый розыгрыш уже начался."
     )
+    user_bot = runtime.bot(settings.user_bot_token)
     if public_text and settings.public_channel:
-        async with Bot(
-            token=settings.user_bot_token,
-            default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-        ) as user_bot:
-            try:
-                await user_bot.send_message(settings.public_channel, public_text)
-            except Exception:
-                pass
-    async with Bot(
-        token=settings.user_bot_token,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-    ) as user_bot:
-        if winner_username:
-            try:
-                await user_bot.send_message(
-                    winner_tg_id,
-                    "🎉 Поздравляем! Вы победитель розыгрыша.",
-                )
-            except Exception:
-                pass
+        try:
+            await user_bot.send_message(settings.public_channel, public_text)
+        except Exception:
+            pass
+    if winner_username:
+        try:
+            await user_bot.send_message(
+                winner_tg_id,
+                "🎉 Поздравляем! Вы победитель розыгрыша.",
+            )
+        except Exception:
+            pass
     celery_app.send_task("worker.tasks.send_broadcast_text", args=[broadcast_text])
     return {"winner_username": winner_username, "winner_tg_id": winner_tg_id}
 
 
-@celery_app.task(name="worker.tasks.automation_rollover_check")
-def automation_rollover_check() -> None:
-    asyncio.run(_automation_rollover_check_async())
+async def _next_rollover_at(settings_row, now: datetime) -> datetime | None:
+    if not settings_row.is_enabled:
+        return None
+    if not settings_row.required_channel or not settings_row.rules_text:
+        return None
+    if settings_row.start_at:
+        return settings_row.start_at
+    run_at = _month_run_at(settings_row.day_of_month, now)
+    if not await should_run_for_month(settings_row, run_at):
+        run_at = _add_one_month(run_at)
+    return run_at
 
 
-async def _automation_rollover_check_async() -> None:
+@celery_app.task(name="worker.tasks.schedule_automation")
+def schedule_automation() -> None:
+    runtime.run(_schedule_automation_async())
+
+
+async def _schedule_automation_async() -> None:
+    # Enqueues one rollover check with an ETA once the run time is within two sweep
+    # intervals; farther runs are left to a later sweep, which keeps ETAs well
+    # under the broker's visibility timeout.
     now = utcnow()
-    async with worker_session() as session:
+    async with runtime.session() as session:
+        run_at = await _next_rollover_at(await get_automation_settings(session), now)
+        await session.commit()
+    redis = runtime.redis()
+    horizon = timedelta(minutes=2 * settings.automation_sweep_minutes)
+    if run_at is None or run_at - now > horizon:
+        # Any check already waiting in the queue becomes a no-op.
+        await redis.delete(AUTOMATION_ETA_KEY)
+        return
+    token = run_at.isoformat()
+    previous = await redis.set(
+        AUTOMATION_ETA_KEY, token, ex=int(horizon.total_seconds()) * 2, get=True
+    )
+    # A completed rollover moves run_at forward, so an overdue run_at means its
+    # check was lost (it failed, or sits with a crashed worker until the visibility
+    # timeout). Enqueue it again; the lease and run month keep duplicates harmless.
+    if previous is not None and previous.decode() == token and run_at > now:
+        return
+    automation_rollover_check.apply_async(args=[token], eta=max(run_at, now))
+
+
+# The run month is recorded in the same transaction, so a redelivered check is a no-op.
+@celery_app.task(name="worker.tasks.automation_rollover_check")
+def automation_rollover_check(token: str | None = None) -> None:
+    runtime.run(_automation_rollover_check_async(token))
+
+
+async def _automation_rollover_check_async(token: str | None = None) -> None:
+    redis = runtime.redis()
+    if token is not None:
+        current = await redis.get(AUTOMATION_ETA_KEY)
+        if current is None or current.decode() != token:
+            # Settings changed after this check was scheduled.
+            return
+    lease = LeaderLease(redis, "automation", ttl=settings.automation_lease_seconds)
+    try:
+        async with lease:
+            if not lease.acquired:
+                # Another replica is running the rollover and will reschedule.
+                return
+            async with runtime.session() as session:
+                fence = await issue_automation_fence(session)
+                await session.commit()
+            await _rollover(utcnow(), lease, fence)
+    finally:
+        if token is not None:
+            # Even a failed check frees its slot, so the next sweep enqueues a new one.
+            release = redis.register_script(_RELEASE_ETA_SCRIPT)
+            await release(keys=[AUTOMATION_ETA_KEY], args=[token])
+    await _schedule_automation_async()
+
+
+async def _rollover(now: datetime, lease: LeaderLease, fence: int) -> None:
+    async with runtime.session() as session:
+        if not await claim_automation_fence(session, token=fence):
+            # A newer lease holder has already been here.
+            logger.warning("Automation rollover refused: fence token %s is stale", fence)
+            return
         settings_row = await get_automation_settings(session)
         if not settings_row.is_enabled:
             await session.commit()
@@ -492,6 +780,7 @@ async def _automation_rollover_check_async() -> None:
         active = await get_active_giveaway(session)
         winner_info = {"winner_username": None, "winner_tg_id": None}
         if active:
+            lease.ensure()
             winner_info = await _draw_and_notify(active, session)
             await close_giveaway(session, giveaway_id=active.id)
 
@@ -504,6 +793,7 @@ async def _automation_rollover_check_async() -> None:
             required_channel=settings_row.required_channel,
             draw_at=draw_at,
         )
+        lease.ensure()
         await _announce_start(giveaway)
         if settings_row.start_at:
             settings_row.start_at = next_run_at